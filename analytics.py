@@ -0,0 +1,155 @@
+# analytics.py
+"""Time series over the game library for the Statistic tab.
+
+The date and rating columns are copied into NumPy arrays once per library
+generation and all rollups are computed on them with bincount. Without NumPy
+the same results are computed with plain Python counters.
+"""
+
+from collections import Counter
+from operator import attrgetter
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the plain Python path gives the same results
+    np = None
+
+
+def _month(day):
+    """Return a date as number of months since year 0 (-1 for no date)"""
+    return day.year * 12 + day.month - 1 if day is not None else -1
+
+
+def _month_label(month):
+    """Format a month number as YYYY-MM"""
+    return f"{month // 12:04d}-{month % 12 + 1:02d}"
+
+
+def _rating(value):
+    """Return a rating as float (NaN if missing or not a number)"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _column(games, field, convert):
+    """Read a field of all games and convert it, once per distinct value"""
+    values = list(map(attrgetter(field), games))
+    converted = {value: convert(value) for value in set(values)}  # Dates and categories repeat a lot
+    return list(map(converted.__getitem__, values))
+
+
+class LibraryColumns:
+    """The columns of the library the rollups need, as arrays when NumPy is available"""
+
+    def __init__(self, games):
+        games = list(games)
+        genre_codes = {}
+        self.added = _column(games, "date_added", _month)
+        self.completed = _column(games, "completion_date", _month)
+        self.rating = _column(games, "rating", _rating)
+        self.genre = _column(games, "genre", lambda genre: genre_codes.setdefault(genre, len(genre_codes)))
+        self.genres = list(genre_codes)  # Code -> genre name
+        if np is not None:
+            self.added = np.array(self.added, dtype=np.int32)
+            self.completed = np.array(self.completed, dtype=np.int32)
+            self.rating = np.array(self.rating, dtype=np.float64)
+            self.genre = np.array(self.genre, dtype=np.int32)
+
+
+def _month_counts(months):
+    """Return {month: number of entries} for all months that are not -1"""
+    if np is None:
+        counts = Counter(months)
+        counts.pop(-1, None)
+        return dict(counts)
+    months = months[months >= 0]
+    if not months.size:
+        return {}
+    first = int(months.min())
+    counts = np.bincount(months - first)
+    present = np.nonzero(counts)[0]
+    return dict(zip((present + first).tolist(), counts[present].tolist()))
+
+
+def completions_per_month(columns):
+    """Return {"YYYY-MM": number of games completed in that month} in month order"""
+    counts = _month_counts(columns.completed)
+    return {_month_label(month): counts[month] for month in sorted(counts)}
+
+
+def genre_ratings_per_year(columns):
+    """Return {genre: {year: average rating}} of the rated games.
+
+    A game counts for the year it was completed, or the year it was added if it
+    is not completed.
+    """
+    if np is None:
+        sums, counts = Counter(), Counter()
+        # Far fewer distinct combinations than games; Counter groups them without a Python loop per game
+        combinations = Counter(zip(columns.added, columns.completed, columns.rating, columns.genre))
+        for (added, completed, rating, genre), number in combinations.items():
+            month = completed if completed >= 0 else added
+            if rating == rating and month >= 0:  # NaN is not equal to itself
+                sums[genre, month // 12] += rating * number
+                counts[genre, month // 12] += number
+        cells = {key: sums[key] / counts[key] for key in counts}
+    else:
+        months = np.where(columns.completed >= 0, columns.completed, columns.added)
+        rated = ~np.isnan(columns.rating) & (months >= 0)
+        if not rated.any():
+            return {}
+        years = months[rated] // 12
+        first_year = int(years.min())
+        span = int(years.max()) - first_year + 1
+        keys = columns.genre[rated] * span + (years - first_year)
+        counts = np.bincount(keys)
+        sums = np.bincount(keys, weights=columns.rating[rated])
+        present = np.nonzero(counts)[0]
+        cells = {
+            (int(key) // span, int(key) % span + first_year): total / count
+            for key, total, count in zip(present, sums[present].tolist(), counts[present].tolist())
+        }
+
+    result = {}
+    for (genre, year), average in sorted(cells.items()):
+        result.setdefault(columns.genres[genre], {})[year] = round(average, 2)
+    return result
+
+
+def backlog_growth(columns):
+    """Return per month the games added and completed and the backlog (added minus completed so far)"""
+    added = _month_counts(columns.added)
+    completed = _month_counts(columns.completed)
+    backlog = 0
+    growth = []
+    for month in sorted(added.keys() | completed.keys()):
+        backlog += added.get(month, 0) - completed.get(month, 0)
+        growth.append({
+            'month': _month_label(month),
+            'added': added.get(month, 0),
+            'completed': completed.get(month, 0),
+            'backlog': backlog,
+        })
+    return growth
+
+
+class Analytics:
+    """Computes the rollups of a library once per generation"""
+
+    def __init__(self):
+        self._generation = None
+        self._result = None
+
+    def get(self, games, generation):
+        """Return the rollups, recomputing them only if the library changed since the last call"""
+        if generation != self._generation:
+            columns = LibraryColumns(games)
+            self._result = {
+                'completions_per_month': completions_per_month(columns),
+                'genre_ratings_per_year': genre_ratings_per_year(columns),
+                'backlog_growth': backlog_growth(columns),
+            }
+            self._generation = generation
+        return self._result
@@ -1,12 +1,91 @@
 # backend.py
 
-from datetime import datetime
+from collections import Counter
+from datetime import datetime, date
+from functools import lru_cache
+import atexit
 import csv
+import json
+import sys
+import threading
+from analytics import Analytics
+from export import DEFAULT_CHUNK_ROWS, export_rows
+from persistence import WriteBehindWriter
+from profiling import STORAGE_METHODS, Instrumentation, public_methods
+from search import FullTextIndex, FuzzyIndex, SortedIndex, TitleIndex, fuzzy_key
+from storage import CsvStorage, StorageConflictError
+
+# How often a change is retried when another process writes at the same time
+MAX_WRITE_ATTEMPTS = 5
+# Libraries with at least this many games build their fuzzy title index on a background thread
+BACKGROUND_FUZZY_INDEX_GAMES = 10_000
+# Fields update_game() can change, reported in "updated" events (the review separately)
+EVENT_FIELDS = ("status", "rating", "genre", "completion_date")
+# Orders supported by get_games_page(sort_by=...)
+SORT_FIELDS = ("id", "title", "rating", "date_added", "completion_date")
+
+
+def normalize_title(title):
+    """Normalize a title for the unique title index (case and whitespace insensitive)"""
+    return " ".join(title.split()).casefold()
+
+
+@lru_cache(maxsize=4096)
+def _date_from_string(value):
+    """Parse a YYYY-MM-DD string once and share the date object between games"""
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def _parse_date(value):
+    """Parse a date given as date object or YYYY-MM-DD string (empty means None)"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, date):
+        return value
+    return _date_from_string(value)
+
+
+def _read_import_file(path):
+    """Yield the records of a CSV or JSON Lines file as dicts (None for broken lines)"""
+    with open(path, "r", newline="") as file:
+        if path.endswith(".jsonl"):
+            for line in file:
+                if line.strip():
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        record = None
+                    yield record if isinstance(record, dict) else None
+        else:
+            yield from csv.DictReader(file)
+
+
+def _matches(status, platform, genre, title, row_status, row_platform, row_genre, row_title):
+    """Check the optional filters of iter_games/stream_games against one game"""
+    return ((not status or status == "All" or row_status == status)
+            and (not platform or row_platform == platform)
+            and (not genre or row_genre == genre)
+            and (not title or title.lower() in row_title.lower()))
+
+
+def stream_games(storage=None, status=None, platform=None, genre=None, title=None):
+    """Yield games as dicts straight from the storage without building a GameLibrary.
+
+    Rows are filtered before they are converted, so memory use stays constant
+    no matter how large the file is. storage defaults to CsvStorage("games.csv").
+    """
+    storage = storage if storage is not None else CsvStorage()
+    for row in storage.iter_rows():
+        if _matches(status, platform, genre, title, row[3], row[2], row[5], row[1]):
+            yield GameLibrary._game_from_row(row).to_dict(include_review=False)
 
 
 class Game:
     """Represents a single game in the collection"""
 
+    # No per-instance __dict__: keeps large libraries small in memory
+    __slots__ = ("id", "title", "platform", "status", "rating", "genre", "review", "date_added", "completion_date")
+
     def __init__(self, id, title, platform, status="Want to Play", genre="Action"):
         """Initialize a new game"""
         self.id = id
@@ -22,19 +101,19 @@ class Game:
     def update(self, status=None, rating=None,genre=None, review=None):
         """Update game information"""
         if status:
-            self.status = status
+            self.status = sys.intern(status)
             self.completion_date = datetime.now().date() if status == "Completed" else None
         if rating is not None:  # Allow 0 as a rating
             self.rating = rating
         if genre is not None:
-            self.genre = genre
+            self.genre = sys.intern(genre)
         if review is not None:
             self.review = review
 
 
-    def to_dict(self):
-        """Convert game object to dictionary for frontend use"""
-        return {
+    def to_dict(self, include_review=True):
+        """Convert game object to dictionary for frontend use (list views leave out the review)"""
+        data = {
             'id': self.id,
             'title': self.title,
             'platform': self.platform,
@@ -45,167 +124,811 @@ class Game:
             'date_added': self.date_added,
             'completion_date': self.completion_date
         }
+        if not include_review:
+            del data['review']
+        return data
+
+
+def _rating_value(rating):
+    """Return a rating as float or None if it is missing or not a number"""
+    if rating is None or rating == "":
+        return None
+    try:
+        return float(rating)
+    except (TypeError, ValueError):
+        return None
+
+
+class GameStatistics:
+    """Running totals over all games, updated on every add and update"""
+
+    def __init__(self):
+        self.total = 0
+        self.completed = 0
+        self.rating_sum = 0.0
+        self.rating_count = 0
+        self.statuses = Counter()
+        self.platforms = Counter()
+        self.genres = Counter()
+        self.ratings = Counter()  # Histogram: rating -> number of games
+
+    @staticmethod
+    def _decrement(counter, key):
+        """Decrement a counter and drop keys that reach zero"""
+        counter[key] -= 1
+        if counter[key] <= 0:
+            del counter[key]
+
+    def add(self, game):
+        """Count a game"""
+        self.total += 1
+        self.completed += game.status == "Completed"
+        self.statuses[game.status] += 1
+        self.platforms[game.platform] += 1
+        self.genres[game.genre] += 1
+        rating = _rating_value(game.rating)
+        if rating is not None:
+            self.rating_sum += rating
+            self.rating_count += 1
+            self.ratings[rating] += 1
+
+    def remove(self, game):
+        """Stop counting a game (call before it is changed)"""
+        self.total -= 1
+        self.completed -= game.status == "Completed"
+        self._decrement(self.statuses, game.status)
+        self._decrement(self.platforms, game.platform)
+        self._decrement(self.genres, game.genre)
+        rating = _rating_value(game.rating)
+        if rating is not None:
+            self.rating_sum -= rating
+            self.rating_count -= 1
+            self._decrement(self.ratings, rating)
+
+    def to_dict(self):
+        """Convert the statistics to a dictionary for frontend use"""
+        return {
+            'total_games': self.total,
+            'completed_games': self.completed,
+            'average_rating': round(self.rating_sum / self.rating_count, 2) if self.rating_count else None,
+            'statuses': dict(self.statuses),
+            'platforms': dict(self.platforms),
+            'genres': dict(self.genres),
+            'ratings': dict(self.ratings),
+        }
+
+
+class FieldIndexes:
+    """Secondary indexes over the filterable fields: value -> ids of the games with that value"""
+
+    FIELDS = ("status", "platform", "genre", "rating", "date_added", "completion_date")
+
+    def __init__(self):
+        self.by_field = {field: {} for field in self.FIELDS}
+
+    @staticmethod
+    def _key(field, game):
+        """Return the indexed value of a field (ratings as numbers, missing values as None)"""
+        value = getattr(game, field)
+        if field == "rating":
+            return _rating_value(value)
+        return value
+
+    def add(self, game):
+        """Index a game"""
+        for field, index in self.by_field.items():
+            key = self._key(field, game)
+            if key is not None:
+                index.setdefault(key, set()).add(game.id)
+
+    def remove(self, game):
+        """Remove a game from the indexes (call before it is changed)"""
+        for field, index in self.by_field.items():
+            key = self._key(field, game)
+            ids = index.get(key)
+            if ids is not None:
+                ids.discard(game.id)
+                if not ids:
+                    del index[key]
+
+    def equal(self, field, value):
+        """Return the ids of the games whose field equals value"""
+        return self.by_field[field].get(value, set())
+
+    def range(self, field, low=None, high=None):
+        """Return the id sets of all values between low and high (inclusive, None means open)"""
+        return [
+            ids for key, ids in self.by_field[field].items()
+            if (low is None or key >= low) and (high is None or key <= high)
+        ]
 
 
 class GameLibrary:
     """Manages the in-memory game collection"""
 
-    def __init__(self):
-        """Initialize empty game library"""
-        self.games = []
-        self.load_from_csv()
+    def __init__(self, csv_path="games.csv", journal_limit=1000, storage=None, write_behind=False,
+                 instrument=False, durability="normal", commit_window=0.0):
+        """Initialize empty game library
+
+        By default the games are stored in csv_path with the given durability
+        (see storage.DURABILITY_LEVELS). Pass a StorageEngine such as
+        SqliteStorage("games.db") as storage to use another backend. With
+        write_behind=True changes are written by a background thread, which
+        group-commits the changes arriving within commit_window seconds; call
+        close() (or flush()) to make sure everything reached the storage.
+        With instrument=True every public method is timed, see get_instrumentation().
+        """
+        if storage is None:
+            storage = CsvStorage(csv_path, journal_limit, durability=durability)
+        self.storage = storage
+        self.writer = None  # WriteBehindWriter when write_behind is enabled
+        self._games = []
+        self._games_by_id = {}  # Primary index: id -> Game
+        self._games_by_title = {}  # Unique index: normalized title -> Game
+        self.title_index = TitleIndex()  # Substring search over titles
+        self._fuzzy_index = None  # Index over fuzzy title keys, built on first use
+        self._fuzzy_build = None  # (thread, games, index) while the fuzzy index is built in the background
+        self._text_index = None  # Full-text index over titles and reviews, built on first use
+        self.statistics = GameStatistics()
+        self.field_indexes = FieldIndexes()  # Secondary indexes for query()
+        self._sorted_indexes = {}  # sort field -> SortedIndex, built on first use
+        self.analytics = Analytics()  # Time series, recomputed once per generation
+        self._filter_cache_key = None  # (filters, fuzzy, generation) of the cached filter result
+        self._filter_cache = []
+        self.generation = 0  # Incremented on every change to the in-memory library
         self.next_id = 1
-        self.csv_path = "./games.csv"
+        self.instrumentation = None  # Instrumentation while enabled
+        self._subscribers = []  # Callbacks for change events, see subscribe()
+        if instrument:
+            self.enable_instrumentation()
+        self.load_from_csv()
+        if write_behind:
+            self.writer = WriteBehindWriter(self.storage, commit_window)
+            atexit.register(self._close_at_exit)  # Runs before the writer's own exit hook
+
+    def enable_instrumentation(self):
+        """Start timing the public methods and the storage engine; returns the Instrumentation"""
+        if self.instrumentation is None:
+            self.instrumentation = Instrumentation()
+            methods = [name for name in public_methods(GameLibrary) if not name.endswith("_instrumentation")]
+            self.instrumentation.attach(self, methods)
+            self.instrumentation.attach(self.storage, STORAGE_METHODS, prefix="storage.")
+        return self.instrumentation
+
+    def disable_instrumentation(self):
+        """Stop timing and remove all wrappers"""
+        if self.instrumentation is not None:
+            self.instrumentation.detach()
+            self.instrumentation = None
+
+    def get_instrumentation(self):
+        """Return the recorded timings per operation, or None if instrumentation is off"""
+        return self.instrumentation.snapshot() if self.instrumentation is not None else None
+
+    def subscribe(self, callback):
+        """Call callback(change) after every change of the library.
+
+        change is a dict with 'event', 'id' and 'fields': "added" with all fields
+        of the new game (without review), "updated" with only the fields that
+        changed, or "reloaded" (id None) when the games were read again from the
+        storage and any view of them may be outdated. After a write conflict the
+        fields of "reloaded" hold 'renumbered': {old id: new id} for games that
+        were added here and got other ids. Callbacks run on the thread that made
+        the change.
+        """
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """Stop calling a callback registered with subscribe()"""
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _publish(self, event, game_id=None, fields=None):
+        """Send a change event to all subscribers"""
+        change = {'event': event, 'id': game_id, 'fields': fields or {}}
+        for callback in list(self._subscribers):
+            try:
+                callback(change)
+            except Exception as e:  # The change is already saved; a broken view must not undo that
+                print(f"Fehler: Benachrichtigung über Änderung fehlgeschlagen: {e}")
+
+    @property
+    def games(self):
+        """All games in insertion order"""
+        return self._games
+
+    @games.setter
+    def games(self, games):
+        """Replace the game list and rebuild the indexes"""
+        self._games = list(games)
+        self._games_by_id = {}
+        self._games_by_title = {}
+        self.title_index = TitleIndex()
+        self._fuzzy_index = None
+        self._fuzzy_build = None  # A running build indexes the old games; its result is dropped
+        self._text_index = None
+        self.statistics = GameStatistics()
+        self.field_indexes = FieldIndexes()
+        self._sorted_indexes = {}
+        for game in self._games:
+            self._index_game(game)
+        self.generation += 1
+
+    def _index_game(self, game):
+        """Add a game to the indexes and statistics"""
+        # The storage renumbers duplicate ids on load; keep the first game if games were assigned with them
+        self._games_by_id.setdefault(game.id, game)
+        # Keep the first game if the file already contains duplicate titles
+        self._games_by_title.setdefault(normalize_title(game.title), game)
+        self.title_index.add(game.id, game.title)
+        if self._fuzzy_index is not None:
+            self._fuzzy_index.add(fuzzy_key(game.title), game.id)
+        self._index_fields(game)
+
+    def _index_fields(self, game):
+        """Add the changeable fields of a game to the indexes and statistics"""
+        self.statistics.add(game)
+        self.field_indexes.add(game)
+        for field, index in self._sorted_indexes.items():
+            index.add(game.id, self._sort_key(field, game))
+        if self._text_index is not None:
+            self._text_index.add(game.id, game.title, self._review_text(game))
+
+    def _unindex_fields(self, game):
+        """Remove the changeable fields of a game from the indexes and statistics (before changing it)"""
+        self.statistics.remove(game)
+        self.field_indexes.remove(game)
+        for field, index in self._sorted_indexes.items():
+            index.remove(game.id, self._sort_key(field, game))
+        if self._text_index is not None:
+            self._text_index.remove(game.id, game.title, self._review_text(game))
+
+    def _review_text(self, game):
+        """Return the full review of a game, reading it from the review store if necessary"""
+        return self.storage.load_review(game.id, game.review)
+
+    def _game_dict(self, game):
+        """Convert a game to a dict including its full review (for detail views)"""
+        data = game.to_dict()
+        data['review'] = self._review_text(game)
+        return data
+
+    @staticmethod
+    def _sort_key(field, game):
+        """Return the value a game is ordered by for a sort field (None sorts last)"""
+        if field == "title":
+            return game.title.casefold()
+        if field == "rating":
+            return _rating_value(game.rating)
+        return getattr(game, field)
+
+    def _sorted_index(self, sort_by):
+        """Return the sorted index for a sort field, building it on first use"""
+        if sort_by not in SORT_FIELDS:
+            print(f"Fehler: Nach '{sort_by}' kann nicht sortiert werden.")
+            raise ValueError(f"Nach '{sort_by}' kann nicht sortiert werden.")
+        index = self._sorted_indexes.get(sort_by)
+        if index is None:
+            index = SortedIndex((game.id, self._sort_key(sort_by, game)) for game in self.games)
+            self._sorted_indexes[sort_by] = index
+        return index
+
+    def _append_game(self, game):
+        """Append a game to the list and the indexes"""
+        self._games.append(game)
+        self._index_game(game)
+
+    def reload_if_changed(self):
+        """Reload the games if the storage was changed by someone else"""
+        self.flush()  # Queued changes must not be lost by reloading
+        if not self.storage.has_changed():
+            return False
+        self.load_from_csv()
+        return True
+
+    @staticmethod
+    def _game_from_row(row):
+        """Create a Game from a CSV row"""
+        # Interning makes all games share one copy of the repeated category strings
+        game = Game(
+            id=int(row[0]),
+            title=row[1],
+            platform=sys.intern(row[2]),
+            status=sys.intern(row[3]),
+            genre=sys.intern(row[5]),
+        )
+        game.rating = sys.intern(str(row[4])) if row[4] else None
+        game.review = row[6] if row[6] else None
+        game.date_added = _parse_date(row[7])
+        game.completion_date = _parse_date(row[8])
+        return game
+
+    @staticmethod
+    def _game_to_row(game):
+        """Convert a Game to a CSV row"""
+        return [
+            game.id, game.title, game.platform, game.status, game.rating, game.genre,
+            game.review, game.date_added, game.completion_date
+        ]
 
     def save_to_csv(self, game):
-        """Save a game to the CSV file."""
-        try:
-            with open("games.csv", "a", newline="\n") as file:
-                writer = csv.writer(file)
-                writer.writerow([
-                    game.id, game.title, game.platform, game.status, game.rating, game.genre,
-                    game.review, game.date_added, game.completion_date
-                ])
-        except FileNotFoundError:
-            print(f"Fehler: Datei {self.csv_path} wurde nicht gefunden.")
-            raise
+        """Save a new game to the storage engine."""
+        if self.writer is not None:
+            self.writer.submit("insert", [self._game_to_row(game)])
+        else:
+            self.storage.insert(self._game_to_row(game))
 
     def load_from_csv(self):
-        """Load games from the CSV file."""
-        try:
-            with open("games.csv", "r", newline="\n") as file:
-                reader = csv.reader(file)
-                next(reader)  # Skip header
-                self.games = []
-                highest_id = 0
-                for row in reader:
-                    if row and row[0].isdigit():
-                        game = Game(
-                            id=int(row[0]),
-                            title=row[1],
-                            platform=row[2],
-                            status=row[3],
-                            genre=row[5],
-                        )
-                        game.rating = (row[4]) if row[4] else None
-                        game.review = row[6] if row[6] else None
-                        game.date_added = datetime.strptime(row[7], "%Y-%m-%d").date() if row[7] else None
-                        game.completion_date = datetime.strptime(row[8], "%Y-%m-%d").date() if row[8] else None
-                        self.games.append(game)
-                        highest_id = max(highest_id, game.id)
-                self.next_id = highest_id + 1  # Update next_id after loading all games
-        except FileNotFoundError:
-            print(f"Fehler: Datei {self.csv_path} wurde nicht gefunden.")
-            self.games = []
-            self.next_id = 1  # Set to 1 if the file doesn't exist
+        """Load all games from the storage engine."""
+        games = [self._game_from_row(row) for row in self.storage.load()]
+        self.games = games
+        self.next_id = max((game.id for game in games), default=0) + 1
+        if len(games) >= BACKGROUND_FUZZY_INDEX_GAMES:
+            self._build_fuzzy_index_in_background()
+        self._publish("reloaded")
+
+    def _build_fuzzy_index_in_background(self):
+        """Start building the fuzzy title index on a thread, so the first duplicate check does not wait for it"""
+        games = list(self._games)  # Titles never change, so the thread only needs its own list
+        index = FuzzyIndex()
+
+        def build():
+            for game in games:
+                index.add(fuzzy_key(game.title), game.id)
+
+        thread = threading.Thread(target=build, name="goodgames-fuzzy-index", daemon=True)
+        thread.start()
+        self._fuzzy_build = (thread, games, index)
+
+    def _fuzzy_title_index(self):
+        """Return the fuzzy title index, finishing a background build or building it now"""
+        if self._fuzzy_build is not None:
+            thread, games, index = self._fuzzy_build
+            thread.join()
+            self._fuzzy_build = None
+            for game in self._games[len(games):]:  # Added while the thread was running
+                index.add(fuzzy_key(game.title), game.id)
+            self._fuzzy_index = index
+        if self._fuzzy_index is None:
+            self._fuzzy_index = FuzzyIndex()
+            for game in self.games:
+                self._fuzzy_index.add(fuzzy_key(game.title), game.id)
+        return self._fuzzy_index
 
     def update_game_in_csv(self, game):
-        """Update the corresponding row in the CSV file."""
-        game_list = []
-        try:
-            with open("games.csv", "r", newline="\n") as file:
-                reader = csv.reader(file)
-                header = next(reader)
-                for row in reader:
-                    if row and row[0].isdigit():
-                        current_game = Game(
-                            id=int(row[0]),
-                            title=row[1],
-                            platform=row[2],
-                            status=row[3],
-                            genre=row[5],
-                        )
-                        current_game.rating = (row[4]) if row[4] else None
-                        current_game.review = row[6] if row[6] else None
-                        current_game.date_added = datetime.strptime(row[7], "%Y-%m-%d").date() if row[7] else None
-                        current_game.completion_date = datetime.strptime(row[8], "%Y-%m-%d").date() if row[8] else None
-                        if current_game.id == game.id:
-                            current_game = game
-                        game_list.append(current_game.to_dict())
-
-            with open("games.csv", "w", newline="\n") as file:
-                writer = csv.DictWriter(file,
-                                        fieldnames=["id", "title", "platform", "status", "rating", "genre", "review", "date_added",
-                                                    "completion_date"])
-                writer.writeheader()
-                writer.writerows(game_list)
-        except ValueError as e:
-            print("Es ist ein Fehler aufgetreten")
-            raise e
+        """Save the new state of a game to the storage engine."""
+        if self.writer is not None:
+            self.writer.submit("update", [self._game_to_row(game)])  # The writer compacts by itself
+            return
+        self.storage.update(self._game_to_row(game))
+        if self.storage.needs_compaction():
+            self.compact()
 
+    def compact(self):
+        """Rewrite the storage from the in-memory games (e.g. fold the CSV journal)."""
+        self.flush()
+        self.storage.compact(self._game_to_row(game) for game in self.games)
+
+    def flush(self):
+        """Wait until the write-behind thread has written all queued changes"""
+        if self.writer is None:
+            return
+        for _attempt in range(MAX_WRITE_ATTEMPTS):
+            self.writer.flush()
+            self._drop_moved_reviews()
+            if not self.writer.conflict:
+                return
+            self._resubmit_after_conflict(self.writer.take_pending())
+        raise StorageConflictError("Änderungen konnten wegen paralleler Zugriffe nicht gespeichert werden.")
+
+    def _resubmit_after_conflict(self, pending):
+        """Reload after another process wrote and queue our unsaved changes again on top.
+
+        Games we added get the next free ids; the "reloaded" event lists them as
+        'renumbered' (old id -> new id, or the id of the same game added by the other process).
+        Their kept reviews and updates move to the new ids (pending holds the inserts first).
+        """
+        self.load_from_csv()
+        renumbered = {}
+        dropped = set()  # Old ids of games the other process added as well
+        for operation, rows in pending:
+            resubmit = []
+            for row in rows:
+                if operation != "insert" and row[0] in dropped:
+                    continue
+                if operation == "review":
+                    game = self._games_by_id.get(renumbered.get(row[0], row[0]))
+                    if game is not None:
+                        self._unindex_fields(game)
+                        game.review = row[1]
+                        self._index_fields(game)
+                        resubmit.append((game.id, row[1]))
+                    continue
+                if operation == "insert":
+                    existing = self._games_by_title.get(normalize_title(row[1]))
+                    if existing is not None:
+                        renumbered[row[0]] = existing.id  # The other process added the same game
+                        dropped.add(row[0])
+                        continue
+                    game = self._game_from_row([self.next_id] + list(row[1:]))
+                    self._append_game(game)
+                    renumbered[row[0]] = game.id
+                    self.next_id += 1
+                else:
+                    game = self._games_by_id.get(renumbered.get(row[0], row[0]))
+                    if game is None:
+                        continue
+                    changed = self._game_from_row(row)
+                    self._unindex_fields(game)
+                    game.status = changed.status
+                    game.rating = changed.rating
+                    game.genre = changed.genre
+                    game.review = changed.review
+                    game.completion_date = changed.completion_date
+                    self._index_fields(game)
+                resubmit.append(self._game_to_row(game))
+            if resubmit:
+                self.writer.submit(operation, resubmit)
+        self.generation += 1
+        self._publish("reloaded", fields={'renumbered': renumbered} if renumbered else None)
 
-        # TODO: Add a try except block to handle the case where the file does not exist
-        pass
+    def _drop_moved_reviews(self):
+        """Keep only the reference in games whose review the write-behind thread moved to the review store"""
+        while not self.writer.moved_reviews.empty():
+            game_id, review, stored = self.writer.moved_reviews.get_nowait()
+            game = self._games_by_id.get(game_id)
+            if game is not None and game.review == review:  # Unless the review changed again meanwhile
+                game.review = stored
+
+    def poll_persistence(self):
+        """Return the results of the background writes finished since the last call.
+
+        A result with 'conflict' means another process wrote at the same time;
+        the library has reloaded and queued its changes again, so views should refresh.
+        """
+        if self.writer is not None:
+            self._drop_moved_reviews()
+        results = []
+        while self.writer is not None and not self.writer.results.empty():
+            results.append(self.writer.results.get_nowait())
+        if any(result.get('conflict') for result in results):
+            self.flush()
+        return results
+
+    def close(self):
+        """Write all queued changes, save a snapshot for the next start and release the storage engine"""
+        if self.writer is not None:
+            atexit.unregister(self._close_at_exit)
+            self.flush()
+            self.writer.close()
+            self._drop_moved_reviews()  # The snapshot must not keep review texts inline
+        if self.writer is None or not self.writer.unsaved:
+            self.storage.save_snapshot(self._game_to_row(game) for game in self.games)
+        self.storage.close()
+
+    def _close_at_exit(self):
+        """Close the library when the program exits without close(), resubmitting changes after a conflict"""
+        self.close()
 
     def add_game(self, title, platform, status="Want to Play", genre="Action"):
         """Add a new game to the library."""
         try:
-            with open("games.csv", "r", newline="\n") as file:
-                reader = csv.reader(file)
-                next(reader)  # Skip header
-                games = []
-                highest_id = 0
-                for row in reader:
-                    if row and row[0].isdigit():
-                        game = Game(
-                            id=int(row[0]),
-                            title=row[1],
-                            platform=row[2],
-                            status=row[3],
-                            genre=row[5]
-                        )
-                        game.rating = (row[4]) if row[4] else None
-                        game.review = row[6] if row[6] else None
-                        game.date_added = datetime.strptime(row[7], "%Y-%m-%d").date() if row[7] else None
-                        game.completion_date = datetime.strptime(row[8], "%Y-%m-%d").date() if row[8] else None
-                        games.append(game)
-                        highest_id = max(highest_id, game.id)
-                self.next_id = highest_id + 1  # Update next_id after loading all games
-            for game in self.games:
-                if game.title == title:
+            for _attempt in range(MAX_WRITE_ATTEMPTS):
+                if self.writer is None:
+                    # The write-behind thread detects foreign writes itself without blocking us;
+                    # _resubmit_after_conflict then gives our games new ids and drops duplicates
+                    self.reload_if_changed()
+                if normalize_title(title) in self._games_by_title:
                     raise ValueError(f"Spiel mit dem Titel '{title}' existiert bereits.")
-            new_game = Game(
-                id=self.next_id,
-                title=title,
-                platform=platform,
-                status=status,
-                genre=genre,
-            )
-            self.save_to_csv(new_game)
-            self.games.append(new_game)
-            #self.next_id += 1
-            return new_game.to_dict()
+                new_game = Game(
+                    id=self.next_id,
+                    title=title,
+                    platform=platform,
+                    status=status,
+                    genre=genre,
+                )
+                try:
+                    self.save_to_csv(new_game)
+                except StorageConflictError:
+                    continue  # Another process wrote in between: reload and try again
+                self._append_game(new_game)
+                self.next_id += 1
+                self.generation += 1
+                self._publish("added", new_game.id, new_game.to_dict(include_review=False))
+                return new_game.to_dict()
+            raise StorageConflictError("Spiel konnte wegen paralleler Zugriffe nicht gespeichert werden.")
         except ValueError as e:
             print(f"Fehler: {e}")
             raise
+
+    def import_games(self, source):
+        """Add many games at once from an iterable of dicts or a .csv/.jsonl file.
+
+        Titles that already exist in the library or earlier in the batch are skipped.
+        Records without title or platform or with malformed dates are counted as invalid.
+        All accepted games are written to the storage in one pass.
+        Returns a dict with the number of inserted, skipped and invalid records.
+        """
+        try:
+            records = _read_import_file(source) if isinstance(source, str) else source
+            summary = {'inserted': 0, 'skipped': 0, 'invalid': 0}
+            candidates = []
+            for record in records:
+                try:
+                    title = (record.get('title') or "").strip()
+                    platform = (record.get('platform') or "").strip()
+                    if not title or not platform:
+                        raise ValueError("Titel und Plattform sind Pflichtfelder.")
+                    game = Game(
+                        id=None,  # Assigned below
+                        title=title,
+                        platform=platform,
+                        status=record.get('status') or "Want to Play",
+                        genre=record.get('genre') or "Action",
+                    )
+                    rating = record.get('rating')
+                    game.rating = None if rating is None or rating == "" else rating  # Allow 0 as a rating
+                    game.review = record.get('review') or None
+                    if record.get('date_added'):
+                        game.date_added = _parse_date(record['date_added'])
+                    game.completion_date = _parse_date(record.get('completion_date'))
+                except (AttributeError, TypeError, ValueError):
+                    summary['invalid'] += 1
+                    continue
+                candidates.append(game)
+
+            for _attempt in range(MAX_WRITE_ATTEMPTS):
+                if self.writer is None:
+                    self.reload_if_changed()  # See add_game
+                new_games = []
+                seen_titles = set()
+                for game in candidates:
+                    key = normalize_title(game.title)
+                    if key in self._games_by_title or key in seen_titles:
+                        continue
+                    seen_titles.add(key)
+                    game.id = self.next_id + len(new_games)
+                    new_games.append(game)
+
+                rows = [self._game_to_row(game) for game in new_games]
+                try:
+                    if self.writer is not None:
+                        self.writer.submit("insert", rows)
+                    else:
+                        self.storage.insert_many(rows)
+                except StorageConflictError:
+                    continue  # Another process wrote in between: reload and try again
+                for game in new_games:
+                    self._append_game(game)
+                self.next_id += len(new_games)
+                self.generation += 1
+                if self._subscribers:
+                    for game in new_games:
+                        self._publish("added", game.id, game.to_dict(include_review=False))
+                summary['inserted'] = len(new_games)
+                summary['skipped'] = len(candidates) - len(new_games)
+                return summary
+            raise StorageConflictError("Spiele konnten wegen paralleler Zugriffe nicht gespeichert werden.")
+        except FileNotFoundError:
+            print(f"Fehler: Datei {source} wurde nicht gefunden.")
+            raise
+
     def update_game(self, game_id, status, genre,rating=None,review=None):
         """Update an existing game's information"""
-        for game in self.games:
-            if game.id == game_id:  # Use object attribute
-                game.update(status,rating, genre, review)
+        for _attempt in range(MAX_WRITE_ATTEMPTS):
+            game = self._games_by_id.get(game_id)
+            if game is None:
+                return None
+            before = {field: getattr(game, field) for field in EVENT_FIELDS}
+            old_review = self._review_text(game) if review is not None else None
+            self._unindex_fields(game)
+            game.update(status,rating, genre, review)
+            if review is not None and self.writer is not None:
+                self.writer.submit("review", [(game.id, review)])  # The writer moves long reviews to the store
+            elif review is not None:
+                game.review = self.storage.store_review(game.id, game.review)  # Long reviews leave the row
+            self._index_fields(game)
+            try:
                 self.update_game_in_csv(game)
-                return game.to_dict()
-        return None
+            except StorageConflictError:
+                self.load_from_csv()  # Another process wrote in between: reload and apply again
+                continue
+            self.generation += 1
+            changed = {field: getattr(game, field) for field in EVENT_FIELDS if getattr(game, field) != before[field]}
+            if review is not None and review != old_review:
+                changed['review'] = review
+            self._publish("updated", game.id, changed)
+            return self._game_dict(game)
+        raise StorageConflictError("Spiel konnte wegen paralleler Zugriffe nicht gespeichert werden.")
     def get_game_by_name(self, name=None):
         if name and name == name:
-            filtered_games = [game for game in self.games if game.title == name]
-        else:
-            filtered_games = self.games
-        return [game.to_dict() for game in filtered_games]
+            game = self._games_by_title.get(normalize_title(name))
+            return [self._game_dict(game)] if game is not None and game.title == name else []
+        return [game.to_dict(include_review=False) for game in self.games]
     def get_games(self, status=None):
-        """Get games, optionally filtered by status"""
-        if status and status != "All":
-            filtered_games = [game for game in self.games if game.status == status]  # Use object attribute
+        """Get games, optionally filtered by status (without reviews)"""
+        return [game.to_dict(include_review=False) for game in self._filtered_games(status=status)]
+
+    def export(self, path, file_format="jsonl", columns=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """Stream the games to a JSON Lines, CSV or columnar file (see export.py); returns rows per second"""
+        rows = (self._game_to_row(game) for game in self.games)
+        return export_rows(rows, self.storage, path, file_format, columns, chunk_rows)
+
+    def iter_games(self, status=None, platform=None, genre=None, title=None):
+        """Lazily yield games as dicts, optionally filtered (title is a case-insensitive substring)"""
+        for game in self._filtered_games(status=status, platform=platform, genre=genre, title=title):
+            yield game.to_dict(include_review=False)
+
+    def query(self, status=None, platform=None, genre=None, min_rating=None, max_rating=None,
+              added_from=None, added_to=None, completed_from=None, completed_to=None, title=None):
+        """Get the games matching all given filters, in id order.
+
+        Ranges are inclusive and may be open on one side; dates are date objects
+        or YYYY-MM-DD strings. Games without a rating (or date) never match a
+        range on it. The filters are answered from the secondary indexes.
+        """
+        games = self._filtered_games(
+            status=status, platform=platform, genre=genre, min_rating=min_rating, max_rating=max_rating,
+            added_from=added_from, added_to=added_to, completed_from=completed_from,
+            completed_to=completed_to, title=title,
+        )
+        return [game.to_dict(include_review=False) for game in games]
+
+    def _query_ids(self, fuzzy=False, status=None, platform=None, genre=None, min_rating=None, max_rating=None,
+                   added_from=None, added_to=None, completed_from=None, completed_to=None, title=None):
+        """Return the ids matching all filters, or None if there are no filters.
+
+        Every filter yields a candidate set; the smallest one is taken first and
+        the others only narrow it down. A range that is larger than the current
+        result is checked on the remaining games instead of being collected.
+        """
+        candidates = []  # (number of ids, id sets to unite, predicate on a game for ranges)
+        for field, value in (("status", status), ("platform", platform), ("genre", genre)):
+            if value and value != "All":
+                ids = self.field_indexes.equal(field, value)
+                candidates.append((len(ids), [ids], None))
+        if title:
+            ids = self.title_index.search(title)
+            if not ids and fuzzy:
+                ids = {game_id for _distance, game_id in self._similar_title_ids(title)}
+            candidates.append((len(ids), [ids], None))
+        for field, low, high in (
+            ("rating", _rating_value(min_rating), _rating_value(max_rating)),
+            ("date_added", _parse_date(added_from), _parse_date(added_to)),
+            ("completion_date", _parse_date(completed_from), _parse_date(completed_to)),
+        ):
+            if low is not None or high is not None:
+                parts = self.field_indexes.range(field, low, high)
+                candidates.append((
+                    sum(map(len, parts)), parts,
+                    lambda game, field=field, low=low, high=high: (
+                        (value := FieldIndexes._key(field, game)) is not None
+                        and (low is None or value >= low) and (high is None or value <= high)
+                    ),
+                ))
+        if not candidates:
+            return None
+
+        candidates.sort(key=lambda candidate: candidate[0])
+        _size, parts, _predicate = candidates[0]
+        result = set().union(*parts)
+        for size, parts, predicate in candidates[1:]:
+            if not result:
+                break
+            if predicate is not None and size > len(result):
+                result = {game_id for game_id in result if predicate(self._games_by_id[game_id])}
+            else:
+                result &= parts[0] if len(parts) == 1 else set().union(*parts)
+        return result
+
+    def _similar_title_ids(self, title, max_distance=None):
+        """Return (distance, id) pairs of games with a title similar to title, closest first"""
+        key = fuzzy_key(title)
+        if max_distance is None:
+            max_distance = max(1, min(3, len(key) // 4))
+        return self._fuzzy_title_index().search(key, max_distance)
+
+    def find_similar_titles(self, title, max_distance=None, limit=5):
+        """Get games whose title is within a small edit distance of title (ignoring case, punctuation and "The")"""
+        matches = self._similar_title_ids(title, max_distance)
+        return [self._games_by_id[game_id].to_dict(include_review=False) for _distance, game_id in matches[:limit]]
+
+    def _filtered_games(self, fuzzy=False, sort_by=None, descending=False, **filters):
+        """Return the games matching the query filters in id (or sort_by) order, cached until the library changes"""
+        key = (tuple(sorted(filters.items())), fuzzy, sort_by, descending, self.generation)
+        if key != self._filter_cache_key:
+            ids = self._query_ids(fuzzy, **filters)
+            if sort_by is not None:
+                # Walking the sorted index keeps the order without sorting the matches
+                ordered = self._sorted_index(sort_by).iter_ids(descending=descending)
+                self._filter_cache = [
+                    self._games_by_id[game_id] for game_id in ordered if ids is None or game_id in ids
+                ]
+            elif ids is None:
+                self._filter_cache = self.games
+            else:
+                self._filter_cache = [self._games_by_id[game_id] for game_id in sorted(ids)]
+            self._filter_cache_key = key
+        return self._filter_cache
+
+    def search_text(self, query, limit=20):
+        """Get the games whose title or review matches the words of query, best match first.
+
+        Every game dict has an additional 'score' (BM25 relevance). The index is
+        built on the first search and kept up to date afterwards.
+        """
+        if self._text_index is None:
+            self._text_index = FullTextIndex()
+            for game in self.games:
+                self._text_index.add(game.id, game.title, self._review_text(game))
+        results = []
+        for score, game_id in self._text_index.search(query, limit):
+            game = self._games_by_id[game_id].to_dict(include_review=False)
+            game['score'] = round(score, 3)
+            results.append(game)
+        return results
+
+    def search_titles(self, query):
+        """Get all games whose title contains query (case-insensitive), using the title index"""
+        return [
+            self._games_by_id[game_id].to_dict(include_review=False)
+            for game_id in sorted(self.title_index.search(query))
+        ]
+
+    def get_games_page(self, offset=0, limit=50, status=None, title=None, fuzzy=False,
+                       sort_by=None, descending=False, cursor=None, **filters):
+        """Get one slice of the filtered games for paging views.
+
+        Returns a dict with the total number of matching games, the games of
+        the requested slice and a cursor for the next page. Scrolling through
+        the same filter reuses the cached result set. With fuzzy=True a title
+        without substring matches falls back to similar titles. Further filters
+        are those of query().
+
+        sort_by orders the games by one of SORT_FIELDS (games without a value
+        come last, also with descending=True). Instead of an offset the cursor
+        of the previous page can be passed (with the same sort_by and
+        descending) to continue right after its last game, even if games were
+        added or changed in between.
+        """
+        offset = max(offset, 0)
+        filtered = any(value not in (None, "", "All") for value in (status, title, *filters.values()))
+        if cursor is not None or (sort_by is not None and not filtered):
+            # Seek in the sorted index and check the filters on the way; no result set is built
+            index = self._sorted_index(sort_by or "id")
+            ids = self._query_ids(fuzzy, status=status, title=title, **filters) if filtered else None
+            start = index.position_after(cursor, descending) if cursor is not None else offset
+            games = []
+            for game_id in index.iter_ids(start, descending):
+                if len(games) >= limit:
+                    break
+                if ids is None or game_id in ids:
+                    games.append(self._games_by_id[game_id])
+            total = len(index) if ids is None else len(ids)
         else:
-            filtered_games = self.games
-        return [game.to_dict() for game in filtered_games]
+            matches = self._filtered_games(fuzzy, sort_by, descending, status=status, title=title, **filters)
+            games = matches[offset:offset + limit]
+            total = len(matches)
+        return {
+            'total': total,
+            'games': [game.to_dict(include_review=False) for game in games],
+            'cursor': SortedIndex.entry(games[-1].id, self._sort_key(sort_by or "id", games[-1])) if games else None,
+        }
+
+    def get_statistics(self):
+        """Get the current statistics without looking at the individual games"""
+        return self.statistics.to_dict()
+
+    def get_analytics(self):
+        """Get completions per month, average rating per genre and year and the backlog growth per month"""
+        return self.analytics.get(self.games, self.generation)
 
     def get_game_by_id(self, game_id):
         """Get a specific game by its ID."""
         try:
-            for game in self.games:
-                if game.id == game_id:
-                    return game.to_dict()
+            game = self._games_by_id.get(game_id)
+            if game is not None:
+                return self._game_dict(game)
             raise ValueError(f"Spiel mit der ID '{game_id}' wurde nicht gefunden.")
         except ValueError as e:
             print(f"Fehler: {e}")
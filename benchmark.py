@@ -0,0 +1,253 @@
+# benchmark.py
+"""Benchmarks for the GameLibrary hot paths.
+
+    python benchmark.py run --sizes 1000 100000 1000000 --output bench.json
+    python benchmark.py compare old.json new.json
+    python benchmark.py memory --count 100000
+
+The run command generates synthetic libraries in temporary directories, so the
+real games.csv is never touched. Results are written as JSON and can be
+compared across commits to catch regressions.
+"""
+
+import argparse
+import csv
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from backend import GameLibrary
+from storage import CSV_FIELDS
+
+PLATFORMS = ["PC", "PS5", "PS4", "Xbox", "Switch"]
+STATUSES = ["Want to Play", "Playing", "Completed", "Abandoned"]
+GENRES = ["Action", "Adventure", "RPG", "Simulation", "Strategy", "Sports", "Puzzle"]
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+
+
+def synthetic_rows(count, seed=42):
+    """Yield reproducible CSV rows for a synthetic library of the given size"""
+    rng = random.Random(seed)
+    start = date(2015, 1, 1)
+    for game_id in range(1, count + 1):
+        status = rng.choice(STATUSES)
+        date_added = start + timedelta(days=rng.randrange(3650))
+        completion_date = date_added + timedelta(days=rng.randrange(200)) if status == "Completed" else ""
+        yield [
+            game_id,
+            f"Game {game_id} {rng.choice(['Quest', 'Legends', 'Tactics', 'Racing', 'Saga'])}",
+            rng.choice(PLATFORMS),
+            status,
+            str(rng.randint(1, 5)) if rng.random() < 0.6 else "",
+            rng.choice(GENRES),
+            "Review text" if rng.random() < 0.3 else "",
+            date_added.isoformat(),
+            completion_date and completion_date.isoformat(),
+        ]
+
+
+def write_synthetic_csv(path, count, seed=42):
+    """Write a synthetic games.csv with count games"""
+    with open(path, "w", newline="\n") as file:
+        writer = csv.writer(file)
+        writer.writerow(CSV_FIELDS)
+        writer.writerows(synthetic_rows(count, seed))
+
+
+def memory_per_game(count=100_000):
+    """Return the number of bytes the in-memory representation needs per game"""
+    rows = [[str(value) for value in row] for row in synthetic_rows(count)]
+    gc.collect()
+    tracemalloc.start()
+    games = [GameLibrary._game_from_row(row) for row in rows]
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del games
+    return size / count
+
+
+def _percentile(sorted_values, fraction):
+    """Return the value at the given fraction of a sorted list"""
+    index = min(int(len(sorted_values) * fraction), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def _measure(operation, repeat):
+    """Run operation(i) repeat times and summarize throughput and latency"""
+    latencies = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        operation(i)
+        latencies.append(time.perf_counter() - start)
+    total = sum(latencies)
+    latencies.sort()
+    return {
+        'operations': repeat,
+        'total_seconds': total,
+        'ops_per_second': repeat / total if total else None,
+        'p50_ms': _percentile(latencies, 0.50) * 1000,
+        'p95_ms': _percentile(latencies, 0.95) * 1000,
+        'p99_ms': _percentile(latencies, 0.99) * 1000,
+        'max_ms': latencies[-1] * 1000,
+    }
+
+
+def benchmark_size(size, seed=42, measure_memory=True):
+    """Benchmark all hot paths on a synthetic library with size games"""
+    rng = random.Random(seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, "games.csv")
+        write_synthetic_csv(csv_path, size, seed)
+
+        libraries = []
+        results['load_from_csv'] = _measure(lambda i: libraries.append(GameLibrary(csv_path)), 1)
+        library = libraries.pop()
+
+        if measure_memory:
+            gc.collect()
+            tracemalloc.start()
+            GameLibrary(csv_path)
+            results['load_from_csv']['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        # The first call waits for the fuzzy title index if it is still built in the background
+        results['find_similar_titles'] = _measure(
+            lambda i: library.find_similar_titles(f"Game {rng.randint(1, size)} Qeust"), 100
+        )
+        ids = [rng.randint(1, size) for _ in range(10_000)]
+        results['get_game_by_id'] = _measure(lambda i: library.get_game_by_id(ids[i]), len(ids))
+        results['add_game'] = _measure(lambda i: library.add_game(f"Benchmark Game {i}", "PC"), 1_000)
+        results['update_game'] = _measure(
+            lambda i: library.update_game(ids[i], rng.choice(STATUSES), rng.choice(GENRES), rng.randint(1, 5)),
+            1_000,
+        )
+        results['update_game_in_csv'] = _measure(
+            lambda i: library.update_game_in_csv(library.games[ids[i] - 1]), 1_000
+        )
+        results['get_games_filtered'] = _measure(lambda i: library.get_games(STATUSES[i % len(STATUSES)]), 8)
+        results['query_compound'] = _measure(
+            lambda i: library.query(status="Completed", platform=PLATFORMS[i % len(PLATFORMS)], min_rating=4), 20
+        )
+        results['top_rated_page'] = _measure(
+            lambda i: library.get_games_page(limit=50, sort_by="rating", descending=True), 100
+        )
+
+        def analytics_after_change(i):
+            library.update_game(ids[i], "Completed", "RPG", 5)  # Invalidates the cached rollups
+            library.get_analytics()
+
+        results['get_analytics'] = _measure(analytics_after_change, 3)
+        results['search_text'] = _measure(lambda i: library.search_text("legends quest review"), 100)
+        results['get_statistics'] = _measure(lambda i: library.get_statistics(), 1_000)
+        export_path = os.path.join(tmp_dir, "export")
+        for file_format in ("jsonl", "columnar"):
+            results[f'export_{file_format}'] = _measure(lambda i: library.export(export_path, file_format), 1)
+        library.close()
+
+        # Bursts of 100 durable updates: one fsync per update vs. group commit on the writer thread
+        for name, options in (
+            ('update_burst_fsync_each', {}),
+            ('update_burst_group_commit', {'write_behind': True, 'commit_window': 0.005}),
+        ):
+            durable = GameLibrary(csv_path, durability="full", **options)
+
+            def update_burst(i):
+                for game_id in ids[i * 100:(i + 1) * 100]:
+                    durable.update_game(game_id, rng.choice(STATUSES), rng.choice(GENRES), rng.randint(1, 5))
+                durable.flush()
+
+            results[name] = _measure(update_burst, 10)
+            durable.close()
+    return results
+
+
+def git_revision():
+    """Return the current commit hash or None outside a git checkout"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, output, measure_memory=True):
+    """Benchmark every size and write the results to output"""
+    report = {
+        'commit': git_revision(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'results': {},
+    }
+    for size in sizes:
+        print(f"Benchmarking {size} games ...")
+        report['results'][str(size)] = benchmark_size(size, measure_memory=measure_memory)
+        for operation, numbers in report['results'][str(size)].items():
+            print(f"  {operation:<20} {numbers['ops_per_second'] or 0:>12.1f} ops/s"
+                  f"  p50 {numbers['p50_ms']:.3f} ms  p99 {numbers['p99_ms']:.3f} ms")
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {output}")
+    return report
+
+
+def compare(old_path, new_path, threshold=0.2):
+    """Print the change of every p50 latency and return the regressions above threshold"""
+    with open(old_path) as file:
+        old = json.load(file)
+    with open(new_path) as file:
+        new = json.load(file)
+    regressions = []
+    for size, operations in new['results'].items():
+        for operation, numbers in operations.items():
+            before = old['results'].get(size, {}).get(operation)
+            if not before or not before['p50_ms']:
+                continue
+            change = numbers['p50_ms'] / before['p50_ms'] - 1
+            marker = "  REGRESSION" if change > threshold else ""
+            print(f"{size:>8} {operation:<20} {before['p50_ms']:>10.3f} -> {numbers['p50_ms']:>10.3f} ms "
+                  f"({change:+.0%}){marker}")
+            if change > threshold:
+                regressions.append((size, operation, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GoodGames benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="benchmark synthetic libraries")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    run_parser.add_argument("--output", default="bench_results.json")
+    run_parser.add_argument("--no-memory", action="store_true", help="skip the peak memory measurement")
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown (0.2 = 20%%)")
+
+    memory_parser = commands.add_parser("memory", help="measure memory per game")
+    memory_parser.add_argument("--count", type=int, default=100_000, help="number of synthetic games")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args.sizes, args.output, measure_memory=not args.no_memory)
+    elif args.command == "compare":
+        if compare(args.old, args.new, args.threshold):
+            sys.exit(1)
+    else:
+        print(f"Memory per game: {memory_per_game(args.count):.1f} bytes ({args.count} games)")
+
+
+if __name__ == "__main__":
+    main()
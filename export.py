@@ -0,0 +1,182 @@
+# export.py
+"""Streaming export of a game library.
+
+    python export.py jsonl games.jsonl
+    python export.py csv games_subset.csv --columns title platform rating
+    python export.py columnar games.ggcol --chunk-rows 10000
+
+Rows come straight from StorageEngine.iter_rows() (or from GameLibrary.export())
+and pass through a generator pipeline: rows -> selected values -> chunks of
+chunk_rows rows -> one encoded write per chunk. Memory therefore depends on the
+chunk size, not on the size of the library. The output is written to a
+temporary file that only replaces the target once the export is complete.
+
+The columnar format starts with COLUMNAR_MAGIC and a JSON line listing the
+columns. Every chunk follows as a block: row count and payload length (two
+little-endian uint32) and a zlib-compressed JSON array with one array of
+values per column. read_columnar() reads it back.
+"""
+
+import argparse
+import csv
+import io
+import json
+import struct
+import sys
+import time
+import zlib
+from datetime import date
+
+from storage import CSV_FIELDS, CsvStorage, SqliteStorage, atomic_write
+
+FORMATS = ("jsonl", "csv", "columnar")
+DEFAULT_CHUNK_ROWS = 5000
+COLUMNAR_MAGIC = b"GGCOL01\n"
+BLOCK_HEADER = struct.Struct("<II")  # rows in the block, length of the compressed payload
+
+
+def _check_columns(columns):
+    """Return the selected columns (all by default) after checking their names"""
+    if not columns:
+        return list(CSV_FIELDS)
+    unknown = [column for column in columns if column not in CSV_FIELDS]
+    if unknown:
+        print(f"Fehler: Unbekannte Spalten {', '.join(unknown)}, erlaubt sind {', '.join(CSV_FIELDS)}.")
+        raise ValueError(f"Unbekannte Spalten: {', '.join(unknown)}")
+    return list(columns)
+
+
+def _value(value):
+    """Convert a storage value to a JSON value (None for empty fields, dates as YYYY-MM-DD)"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def select_values(rows, storage, columns):
+    """Yield the values of the selected columns of every row, with reviews read from the review store"""
+    positions = [CSV_FIELDS.index(column) for column in columns]
+    id_slot = positions.index(0) if 0 in positions else None
+    review = CSV_FIELDS.index("review")
+    review_slot = positions.index(review) if review in positions else None
+    for row in rows:
+        # Most values are non-empty strings and are taken as they are
+        values = [value if value.__class__ is str and value else _value(value)
+                  for value in map(row.__getitem__, positions)]
+        if id_slot is not None:
+            values[id_slot] = int(row[0])
+        if review_slot is not None and values[review_slot] is not None:
+            values[review_slot] = storage.load_review(int(row[0]), row[review])
+        yield values
+
+
+def chunked(items, size):
+    """Yield lists of up to size items"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def encode_jsonl(chunks, columns):
+    """Yield every chunk as JSON Lines, one object per game"""
+    for chunk in chunks:
+        lines = [json.dumps(dict(zip(columns, values)), ensure_ascii=False) for values in chunk]
+        yield len(chunk), ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def encode_csv(chunks, columns):
+    """Yield a header line and then every chunk as CSV rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for chunk in chunks:
+        writer.writerows(["" if value is None else value for value in values] for values in chunk)
+        yield len(chunk), buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield 0, buffer.getvalue().encode("utf-8")  # Header of an empty export
+
+
+def encode_columnar(chunks, columns):
+    """Yield the file header and then every chunk as a compressed block of columns"""
+    yield 0, COLUMNAR_MAGIC + json.dumps({'columns': columns}).encode("utf-8") + b"\n"
+    for chunk in chunks:
+        payload = zlib.compress(json.dumps([list(column) for column in zip(*chunk)], ensure_ascii=False)
+                                .encode("utf-8"))
+        yield len(chunk), BLOCK_HEADER.pack(len(chunk), len(payload)) + payload
+
+
+ENCODERS = {"jsonl": encode_jsonl, "csv": encode_csv, "columnar": encode_columnar}
+
+
+def export_rows(rows, storage, path, file_format="jsonl", columns=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Export rows (in CSV_FIELDS order) to path; returns {'rows', 'seconds', 'rows_per_second'}"""
+    if file_format not in ENCODERS:
+        print(f"Fehler: Unbekanntes Format '{file_format}', erlaubt sind {', '.join(FORMATS)}.")
+        raise ValueError(f"Unbekanntes Format '{file_format}'.")
+    columns = _check_columns(columns)
+    exported = 0
+    start = time.perf_counter()
+
+    def write(file):
+        nonlocal exported
+        chunks = chunked(select_values(rows, storage, columns), chunk_rows)
+        for count, data in ENCODERS[file_format](chunks, columns):
+            file.write(data)
+            exported += count
+
+    atomic_write(path, write, "wb", sync=False)
+    seconds = time.perf_counter() - start
+    return {'rows': exported, 'seconds': seconds, 'rows_per_second': exported / seconds if seconds else None}
+
+
+def read_columnar(path):
+    """Yield the games of a columnar export as dicts"""
+    with open(path, "rb") as file:
+        if file.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+            print(f"Fehler: Datei {path} ist kein GoodGames-Spaltenexport.")
+            raise ValueError(f"Datei {path} ist kein GoodGames-Spaltenexport.")
+        columns = json.loads(file.readline())['columns']
+        while True:
+            header = file.read(BLOCK_HEADER.size)
+            if not header:
+                return
+            _count, length = BLOCK_HEADER.unpack(header)
+            values = json.loads(zlib.decompress(file.read(length)))
+            for row in zip(*values):
+                yield dict(zip(columns, row))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the GoodGames library")
+    parser.add_argument("format", choices=FORMATS)
+    parser.add_argument("output")
+    parser.add_argument("--columns", nargs="+", choices=CSV_FIELDS, help="columns to export (default: all)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="rows per write")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--csv", default="games.csv", help="library CSV file (default: games.csv)")
+    source.add_argument("--sqlite", help="library SQLite database instead of the CSV file")
+
+    args = parser.parse_args()
+    storage = SqliteStorage(args.sqlite) if args.sqlite else CsvStorage(args.csv)
+    try:
+        result = export_rows(storage.iter_rows(), storage, args.output, args.format, args.columns, args.chunk_rows)
+    except (OSError, ValueError) as e:
+        print(f"Fehler: Export fehlgeschlagen: {e}")
+        sys.exit(1)
+    finally:
+        storage.close()
+    print(f"Exported {result['rows']} games to {args.output} in {result['seconds']:.2f} s "
+          f"({result['rows_per_second'] or 0:.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,32 @@
+import time
+
+STARTED = time.perf_counter()  # Measure the time until the window is shown from the very first import
+
 import tkinter as tk
 from tkinter import ttk, messagebox
 from backend import GameLibrary
-from PIL import Image, ImageTk
 import csv
-
+import os
+
+# Number of rows the library treeview shows at once; only these rows exist as Tk items
+LIBRARY_VISIBLE_ROWS = 15
+# Wait this long after the last keystroke before searching by name
+NAME_FILTER_DELAY_MS = 150
+# How often the results of background saves are checked
+PERSISTENCE_POLL_MS = 200
+# Set GOODGAMES_PROFILE=1 to time the backend and print the timings on exit
+PROFILE = os.environ.get("GOODGAMES_PROFILE") == "1"
+# The logo is resized once and cached as PNG, which Tk can show without PIL
+LOGO_PATH = "logo.webp"
+LOGO_CACHE_PATH = ".logo_cache.png"
+LOGO_SIZE = (150, 150)
+# Library columns the backend can sort by (click the heading, click again to reverse)
+SORTABLE_COLUMNS = {"ID": "id", "Title": "title", "Rating": "rating"}
+# Treeview column of each game field the library view shows
+LIBRARY_COLUMNS = {"id": 0, "title": 1, "platform": 2, "status": 3, "rating": 4, "genre": 5}
+# Notebook tab indexes
+LIBRARY_TAB = 1
+STATISTIC_TAB = 2
 
 
 class GoodGamesApp:
@@ -15,8 +38,9 @@ class GoodGamesApp:
         self.root.title("GoodGames - Game Collection Tracker")
         self.logo = None
 
-        # Initialize game library
-        self.library = GameLibrary()
+        # Initialize game library (changes are saved by a background thread; edits within 50 ms share one fsync)
+        self.library = GameLibrary(write_behind=True, instrument=PROFILE, durability="full", commit_window=0.05)
+        self.library_loaded = time.perf_counter()
 
         # Setup main container
         self.setup_main_container()
@@ -24,22 +48,70 @@ class GoodGamesApp:
         # Create tabs
         self.create_notebook()
 
-        # Setup individual tabs
+        # Only the first tab is built now; Library and Statistic are built when first opened
+        self.tree = None
+        self.statistic_labels = None
         self.setup_add_game_tab()
-        self.setup_library_tab()
-        self.setup_statistic_tab()
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
 
-        # Bind tab change event
-        self.notebook.bind("<<NotebookTabChanged>>", lambda e: self.refresh_library())
-        self.notebook.bind("<<NotebookTabChanged>>", lambda e: self.refresh_logo())
+        # Changes are patched into the views row by row; full refreshes are batched
+        self.library_refresh_job = None
+        self.library.subscribe(self.on_library_change)
 
         self.add_logo()
 
+        # Report background saves and save everything before the window closes
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(PERSISTENCE_POLL_MS, self.poll_persistence)
+        self.root.after_idle(self.report_startup_time)
+
+    def report_startup_time(self):
+        """Print how long it took until the window was ready"""
+        now = time.perf_counter()
+        print(f"Startup: window ready after {(now - STARTED) * 1000:.0f} ms "
+              f"(library loaded after {(self.library_loaded - STARTED) * 1000:.0f} ms)")
+
+    def on_tab_changed(self, event=None):
+        """Build a tab when it is opened for the first time and refresh its content"""
+        self.refresh_logo()
+        current_tab = self.notebook.index(self.notebook.select())
+        if current_tab == LIBRARY_TAB:
+            if self.tree is None:
+                self.setup_library_tab()  # Shows the first page by itself; later changes arrive as events
+        elif current_tab == STATISTIC_TAB:
+            if self.statistic_labels is None:
+                self.setup_statistic_tab()
+            self.refresh_trends()  # The counters are kept current by events, the trends are not
+
     def setup_main_container(self):
         """Setup the main container frame"""
         self.main_frame = ttk.Frame(self.root, padding="10")
         self.main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
 
+        self.save_status_label = ttk.Label(self.main_frame, text="")
+        self.save_status_label.grid(row=1, column=0, sticky="w")
+
+    def poll_persistence(self):
+        """Show the results of background saves (runs on the Tk thread)"""
+        for result in self.library.poll_persistence():
+            if result['ok']:
+                self.save_status_label.config(text="All changes saved")
+            elif result.get('conflict'):
+                # Another program wrote to the library; the backend reloaded (the views follow its
+                # "reloaded" event) and saves our changes again
+                self.save_status_label.config(text="Merged changes made by another program")
+            else:
+                self.save_status_label.config(text="Saving failed, retrying with the next change")
+                messagebox.showerror("Error", f"Could not save changes: {result['error']}")
+        self.root.after(PERSISTENCE_POLL_MS, self.poll_persistence)
+
+    def on_close(self):
+        """Write all pending changes before closing the window"""
+        self.library.close()
+        if self.library.instrumentation is not None:
+            print(self.library.instrumentation.report())
+        self.root.destroy()
+
     def refresh_logo(self):
         """Ensure the logo stays in place when switching tabs."""
         current_tab = self.notebook.index(self.notebook.select())
@@ -57,14 +129,35 @@ class GoodGamesApp:
                              sticky="w")  # Erhöhe die Spaltenanzahl, damit es nicht überschrieben wird.
 
         try:
-            logo_image = Image.open("logo.webp")
-            logo_image = logo_image.resize((150, 150), Image.Resampling.LANCZOS)
-            self.logo_photo = ImageTk.PhotoImage(logo_image)
-            logo_label = ttk.Label(self.logo_frame, image=self.logo_photo)
-            logo_label.grid(row=0, column=0, padx=10, pady=10)
-            self.logo = logo_label
+            self.logo_photo = self.load_logo()
         except FileNotFoundError:
             print("Logo file 'logo.webp' not found. Please place it in the same directory as this script.")
+            return
+        if self.logo_photo is None:
+            return
+        logo_label = ttk.Label(self.logo_frame, image=self.logo_photo)
+        logo_label.grid(row=0, column=0, padx=10, pady=10)
+        self.logo = logo_label
+
+    def load_logo(self):
+        """Return the resized logo as PhotoImage, using the cached thumbnail when it is up to date"""
+        logo_mtime = os.path.getmtime(LOGO_PATH)
+        if os.path.exists(LOGO_CACHE_PATH) and os.path.getmtime(LOGO_CACHE_PATH) >= logo_mtime:
+            return tk.PhotoImage(file=LOGO_CACHE_PATH)
+
+        # Decoding WebP needs PIL, which is only imported when the cache has to be (re)built
+        try:
+            from PIL import Image, ImageTk
+        except ImportError:
+            print("Pillow is not installed, the logo is not shown.")
+            return None
+        logo_image = Image.open(LOGO_PATH)
+        logo_image = logo_image.resize(LOGO_SIZE, Image.Resampling.LANCZOS)
+        try:
+            logo_image.save(LOGO_CACHE_PATH, "PNG")
+        except OSError as e:
+            print(f"Logo cache '{LOGO_CACHE_PATH}' could not be written: {e}")
+        return ImageTk.PhotoImage(logo_image)
 
     def create_notebook(self):
         """Create the notebook (tabbed interface)"""
@@ -127,24 +220,13 @@ class GoodGamesApp:
 
     def setup_statistic_tab(self):
         """Setup the Statistic tab interface"""
-        # Clear previous content
-        for widget in self.statistic_frame.winfo_children():
-            widget.destroy()
-
         ttk.Label(self.statistic_frame, text="Game Statistics", font=("Arial", 14, "bold")).pack(pady=10)
 
-        # Get statistics data
-        games = self.library.get_games()
-
-        # Spiele-Zählung & Durchschnittsbewertung
-        completed_games = [game for game in games if game['status'] == "Completed"]
-        completed_count = len(completed_games)
-        ratings = [float(game['rating']) for game in games if game['rating'] not in [None, ""]]
-        avg_rating = round(sum(ratings) / len(ratings), 2) if ratings else "No ratings"
-
-
-        ttk.Label(self.statistic_frame, text=f"Total Completed Games: {completed_count}").pack(pady=5)
-        ttk.Label(self.statistic_frame, text=f"Average Rating: {avg_rating}").pack(pady=5)
+        # Spiele-Zählung & Durchschnittsbewertung (Texte setzt update_statistic_labels)
+        self.completed_label = ttk.Label(self.statistic_frame)
+        self.completed_label.pack(pady=5)
+        self.average_label = ttk.Label(self.statistic_frame)
+        self.average_label.pack(pady=5)
 
         # Plattform-Statistik
         platform_frame = ttk.LabelFrame(self.statistic_frame, text="Games per Platform")
@@ -154,28 +236,68 @@ class GoodGamesApp:
         genre_frame = ttk.LabelFrame(self.statistic_frame, text="Games per Genre")
         genre_frame.pack(fill="both", expand=True, padx=10, pady=5)
 
-        # Zählungen initialisieren
-        platform_count = {}
-        genre_count = {}
-
-        for game in games:
-            platform = game['platform']
-            genre = game['genre']
-
-            platform_count[platform] = platform_count.get(platform, 0) + 1
-            genre_count[genre] = genre_count.get(genre, 0) + 1
-
-        # Plattform-Anzeige
-        for platform, count in platform_count.items():
-            ttk.Label(platform_frame, text=f"{platform}: {count} games").pack(anchor="w", padx=10, pady=2)
-
-        # Genre-Anzeige
-        for genre, count in genre_count.items():
-            ttk.Label(genre_frame, text=f"{genre}: {count} games").pack(anchor="w", padx=10, pady=2)
-
-        # Refresh statistics when tab is selected
-        self.notebook.bind("<<NotebookTabChanged>>", lambda e: self.setup_statistic_tab() if self.notebook.index(
-            self.notebook.select()) == 2 else None)
+        # One label per platform and genre: statistics key -> (frame, {name: label})
+        self.statistic_labels = {'platforms': (platform_frame, {}), 'genres': (genre_frame, {})}
+        self.update_statistic_labels()
+
+        # Zeitreihen: Abschlüsse, Bewertungen pro Genre und Backlog
+        self.trend_frame = ttk.LabelFrame(self.statistic_frame, text="Trends")
+        self.trend_frame.pack(fill="both", expand=True, padx=10, pady=5)
+
+        # Backend-Laufzeiten (nur mit GOODGAMES_PROFILE=1)
+        self.timing_frame = None
+        if self.library.instrumentation is not None:
+            self.timing_frame = ttk.LabelFrame(self.statistic_frame, text="Backend Timings")
+            self.timing_frame.pack(fill="both", expand=True, padx=10, pady=5)
+
+    def update_statistic_labels(self):
+        """Show the current counters (the backend keeps them as running totals, so this is cheap)"""
+        stats = self.library.get_statistics()
+        avg_rating = stats['average_rating'] if stats['average_rating'] is not None else "No ratings"
+        self.completed_label.config(text=f"Total Completed Games: {stats['completed_games']}")
+        self.average_label.config(text=f"Average Rating: {avg_rating}")
+
+        for key, (frame, labels) in self.statistic_labels.items():
+            counts = stats[key]
+            for name in [name for name in labels if name not in counts]:
+                labels.pop(name).destroy()
+            for name, count in counts.items():
+                if name not in labels:
+                    labels[name] = ttk.Label(frame)
+                    labels[name].pack(anchor="w", padx=10, pady=2)
+                labels[name].config(text=f"{name}: {count} games")
+
+    def refresh_trends(self):
+        """Rebuild the trend and timing lines of the Statistic tab"""
+        for widget in self.trend_frame.winfo_children():
+            widget.destroy()
+        trends = self.library.get_analytics()
+        recent_completions = list(trends['completions_per_month'].items())[-6:]
+        if recent_completions:
+            text = ", ".join(f"{month}: {count}" for month, count in recent_completions)
+            ttk.Label(self.trend_frame, text=f"Completed per month: {text}").pack(anchor="w", padx=10, pady=2)
+        if trends['backlog_growth']:
+            latest = trends['backlog_growth'][-1]
+            ttk.Label(
+                self.trend_frame,
+                text=f"Backlog: {latest['backlog']} games ({latest['month']}: "
+                     f"+{latest['added']} added, -{latest['completed']} completed)"
+            ).pack(anchor="w", padx=10, pady=2)
+        for genre, years in trends['genre_ratings_per_year'].items():
+            text = ", ".join(f"{year}: {average}" for year, average in list(years.items())[-3:])
+            ttk.Label(self.trend_frame, text=f"{genre} average rating: {text}").pack(anchor="w", padx=10, pady=2)
+
+        timings = self.library.get_instrumentation()
+        if self.timing_frame is not None and timings:
+            for widget in self.timing_frame.winfo_children():
+                widget.destroy()
+            slowest = sorted(timings.items(), key=lambda item: -item[1]['total_ms'])[:8]
+            for operation, timing in slowest:
+                ttk.Label(
+                    self.timing_frame,
+                    text=f"{operation}: {timing['calls']} calls, {timing['total_ms']:.1f} ms total, "
+                         f"{timing['max_ms']:.1f} ms max"
+                ).pack(anchor="w", padx=10, pady=2)
 
     def setup_library_tab(self):
         """Setup the Library tab interface"""
@@ -211,7 +333,7 @@ class GoodGamesApp:
             values=("All", "Want to Play", "Playing", "Completed", "Abandoned")
         )
         filter_combo.grid(row=0, column=1, pady=5)
-        filter_combo.bind("<<ComboboxSelected>>", lambda e: self.refresh_library())
+        filter_combo.bind("<<ComboboxSelected>>", lambda e: self.apply_library_filter())
 
     def setup_library_filter_name(self, parent):
         """Setup the filter by name in the library tab"""
@@ -226,16 +348,25 @@ class GoodGamesApp:
         )
         name_filter_entry.grid(row=0, column=3, pady=5)
 
-        # Bindet die Aktualisierung der Liste an jede Tasteneingabe
-        name_filter_entry.bind("<KeyRelease>", lambda e: self.refresh_library())
+        # Aktualisiert die Liste erst, wenn kurz keine Taste mehr gedrückt wurde
+        self.name_filter_job = None
+        name_filter_entry.bind("<KeyRelease>", lambda e: self.schedule_name_filter())
 
     def setup_library_treeview(self, parent):
         """Setup the treeview that displays the game library"""
+        # The treeview is virtualized: it only holds the visible rows starting at library_offset
+        self.library_offset = 0
+        self.library_total = 0
+        self.selected_game_id = None
+        self.library_sort = None  # Column the library is sorted by (None: insertion order)
+        self.library_descending = False
+
         # Create Treeview
         self.tree = ttk.Treeview(
             parent,
             columns=("ID", "Title", "Platform", "Status", "Rating", "Genre"),
-            show="headings"
+            show="headings",
+            height=LIBRARY_VISIBLE_ROWS
         )
         self.tree.grid(row=1, column=0, columnspan=2, pady=10)
 
@@ -250,17 +381,22 @@ class GoodGamesApp:
         }
 
         for col, width in columns.items():
-            self.tree.heading(col, text=col)
+            if col in SORTABLE_COLUMNS:
+                self.tree.heading(col, text=col, command=lambda c=col: self.sort_library_by(c))
+            else:
+                self.tree.heading(col, text=col)
             self.tree.column(col, width=width)
 
-        # Add scrollbar
-        scrollbar = ttk.Scrollbar(
+        # Add scrollbar (scrolls through the backend result set, not the treeview items)
+        self.library_scrollbar = ttk.Scrollbar(
             self.library_frame,
             orient=tk.VERTICAL,
-            command=self.tree.yview
+            command=self.on_library_scroll
         )
-        scrollbar.grid(row=1, column=2, sticky='ns')
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.library_scrollbar.grid(row=1, column=2, sticky='ns')
+        self.tree.bind("<MouseWheel>", self.on_library_mousewheel)
+        self.tree.bind("<Button-4>", self.on_library_mousewheel)
+        self.tree.bind("<Button-5>", self.on_library_mousewheel)
 
         # Bind selection event
         self.tree.bind("<<TreeviewSelect>>", self.on_select)
@@ -346,7 +482,19 @@ class GoodGamesApp:
             messagebox.showerror("Error", "Title and Platform are required!")
             return
 
-        self.library.add_game(title, platform, status, genre)
+        # Warn about possible duplicates like "The Witcher 3" vs. "Witcher 3"
+        similar = [game['title'] for game in self.library.find_similar_titles(title)]
+        if similar and not messagebox.askyesno(
+            "Possible Duplicate",
+            "Similar games are already in your library:\n" + "\n".join(similar) + "\n\nAdd the game anyway?"
+        ):
+            return
+
+        try:
+            self.library.add_game(title, platform, status, genre)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
 
         # Clear inputs
         self.title_var.set("")
@@ -354,22 +502,19 @@ class GoodGamesApp:
         self.status_var.set("Want to Play")
         self.genre_var.set("Action")
 
-        # Show success message
+        # Show success message (the views were already updated through on_library_change)
         messagebox.showinfo("Success", "Game added successfully!")
 
-        # Refresh library view
-        self.refresh_library()
-
     def update_game(self):
         """Handle updating game details"""
-        selection = self.tree.selection()
-        if not selection:
+        if self.selected_game_id is None:
             messagebox.showerror("Error", "Please select a game to update!")
             return
 
-        game_id = self.tree.item(selection[0])['values'][0]
-        status = self.tree.item(selection[0])['values'][3]
-        genre = self.tree.item(selection[0])["values"][5]
+        game_id = self.selected_game_id
+        game = self.library.get_game_by_id(game_id)
+        status = game['status']
+        genre = game['genre']
         rating = self.rating_var.get()
         review = self.review_text.get("1.0", tk.END).strip()
 
@@ -380,46 +525,165 @@ class GoodGamesApp:
             messagebox.showerror("Error", "Rating must be a number between 1 and 5!")
             return
 
-        # Update game
+        # Update game (the row and the overview are patched through on_library_change)
         self.library.update_game(game_id, status, genre, rating, review)
+        messagebox.showinfo("Success", "Game updated successfully!")
 
-        # Refresh views
+    def schedule_name_filter(self):
+        """Debounce the name filter so fast typing triggers only one search"""
+        if self.name_filter_job is not None:
+            self.root.after_cancel(self.name_filter_job)
+        self.name_filter_job = self.root.after(NAME_FILTER_DELAY_MS, self.apply_name_filter)
+
+    def apply_name_filter(self):
+        """Run the debounced name search"""
+        self.name_filter_job = None
+        self.apply_library_filter()
+
+    def sort_library_by(self, column):
+        """Sort the library by a column; clicking the same column again reverses the order"""
+        if self.library_sort == column:
+            self.library_descending = not self.library_descending
+        else:
+            self.library_sort = column
+            self.library_descending = False
+        for col in SORTABLE_COLUMNS:
+            arrow = (" ▼" if self.library_descending else " ▲") if col == column else ""
+            self.tree.heading(col, text=col + arrow)
+        self.apply_library_filter()
+
+    def apply_library_filter(self):
+        """Show the first rows of the library after a filter changed"""
+        self.library_offset = 0
         self.refresh_library()
-        self.on_select()  # Refresh details view
-        messagebox.showinfo("Success", "Game updated successfully!")
+
+    def on_library_change(self, change):
+        """Patch the views after a change of the library instead of rebuilding them"""
+        renumbered = change['fields'].get('renumbered', {}) if change['event'] == "reloaded" else {}
+        if self.selected_game_id in renumbered:
+            self.selected_game_id = renumbered[self.selected_game_id]  # Its old id may now be another game
+        if self.statistic_labels is not None:
+            self.update_statistic_labels()
+        if self.tree is None:
+            return  # The Library tab is built with the current data when it is first opened
+        if change['event'] == "updated":
+            self.patch_library_row(change['id'], change['fields'])
+        elif change['event'] == "added" and self.new_games_go_last():
+            self.append_library_row(change['fields'])
+        else:
+            self.schedule_library_refresh()
+
+    def new_games_go_last(self):
+        """Return True if the library view shows all games in id order, so new games are appended"""
+        return (self.filter_status_var.get() in ("", "All") and not self.filter_name_var.get().strip()
+                and self.library_sort in (None, "ID") and not self.library_descending)
+
+    def patch_library_row(self, game_id, fields):
+        """Show the changed fields of a game in its row and in the overview"""
+        filtered_by_status = self.filter_status_var.get() not in ("", "All")
+        if ('status' in fields and filtered_by_status) or ('rating' in fields and self.library_sort == "Rating"):
+            self.schedule_library_refresh()  # The game may enter, leave or move within the visible rows
+        elif self.tree.exists(str(game_id)):
+            values = list(self.tree.item(str(game_id), 'values'))
+            for field, value in fields.items():
+                if field in LIBRARY_COLUMNS:
+                    values[LIBRARY_COLUMNS[field]] = value if value else ""
+            self.tree.item(str(game_id), values=values)
+        if game_id == self.selected_game_id:
+            self.patch_overview_panel(fields)
+
+    def append_library_row(self, game):
+        """Count a new game and show it if the last page has room for it"""
+        self.library_total += 1
+        shown = len(self.tree.get_children())
+        if shown < LIBRARY_VISIBLE_ROWS and self.library_offset + shown == self.library_total - 1:
+            self.tree.insert("", tk.END, iid=str(game['id']), values=self.library_row(game))
+        self.update_library_scrollbar()
+
+    def schedule_library_refresh(self):
+        """Refresh the visible rows once, after the current burst of changes"""
+        if self.library_refresh_job is None:
+            self.library_refresh_job = self.root.after_idle(self.run_library_refresh)
+
+    def run_library_refresh(self):
+        """Run the refresh scheduled by schedule_library_refresh"""
+        self.library_refresh_job = None
+        self.refresh_library()
+
+    @staticmethod
+    def library_row(game):
+        """Return the treeview values of a game"""
+        return (
+            game['id'],
+            game['title'],
+            game['platform'],
+            game['status'],
+            game['rating'] if game['rating'] else "",
+            game["genre"]
+        )
 
     def refresh_library(self):
-        """Refresh the library view"""
-        # Clear current items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        # Hole alle Spiele und filtere nach Status
-        selected_status = self.filter_status_var.get()
-        if selected_status == "All":
-            games = self.library.get_games()
+        """Refresh the visible rows of the library view"""
+        if self.tree is None:
+            return  # The Library tab has not been opened yet
+        # Hole nur die sichtbaren Spiele, gefiltert nach Status und Namen (Teilstring, case-insensitive)
+        query = {
+            'status': self.filter_status_var.get(),
+            'title': self.filter_name_var.get().strip(),
+            'fuzzy': True,
+            'sort_by': SORTABLE_COLUMNS.get(self.library_sort),
+            'descending': self.library_descending,
+        }
+        page = self.library.get_games_page(self.library_offset, LIBRARY_VISIBLE_ROWS, **query)
+        self.library_total = page['total']
+        max_offset = max(self.library_total - LIBRARY_VISIBLE_ROWS, 0)
+        if self.library_offset > max_offset:
+            self.library_offset = max_offset
+            page = self.library.get_games_page(self.library_offset, LIBRARY_VISIBLE_ROWS, **query)
+
+        # Clear current items (at most LIBRARY_VISIBLE_ROWS)
+        self.tree.delete(*self.tree.get_children())
+
+        # Füge die sichtbaren Spiele zur Treeview hinzu
+        for game in page['games']:
+            self.tree.insert("", tk.END, iid=str(game['id']), values=self.library_row(game))
+
+        # Keep the selected game highlighted when it is scrolled back into view
+        if self.selected_game_id is not None and self.tree.exists(str(self.selected_game_id)):
+            self.tree.selection_set(str(self.selected_game_id))
+
+        self.update_library_scrollbar()
+
+    def update_library_scrollbar(self):
+        """Position the scrollbar relative to the whole result set"""
+        if self.library_total:
+            first = self.library_offset / self.library_total
+            last = min(self.library_offset + LIBRARY_VISIBLE_ROWS, self.library_total) / self.library_total
+            self.library_scrollbar.set(first, last)
         else:
-            games = self.library.get_games(selected_status)
-
-        # Filtere nach Namen (Teilstring-Suche, case-insensitive)
-        name_filter = self.filter_name_var.get().strip().lower()
-        if name_filter:
-            games = [game for game in games if name_filter in game['title'].lower()]
-
-        # Füge gefilterte Spiele zur Treeview hinzu
-        for game in games:
-            self.tree.insert(
-                "",
-                tk.END,
-                values=(
-                    game['id'],
-                    game['title'],
-                    game['platform'],
-                    game['status'],
-                    game['rating'] if game['rating'] else "",
-                    game["genre"]
-                )
-            )
+            self.library_scrollbar.set(0, 1)
+
+    def scroll_library_to(self, offset):
+        """Show the rows starting at offset in the library view"""
+        max_offset = max(self.library_total - LIBRARY_VISIBLE_ROWS, 0)
+        offset = min(max(offset, 0), max_offset)
+        if offset != self.library_offset:
+            self.library_offset = offset
+            self.refresh_library()
+
+    def on_library_scroll(self, action, amount, unit=None):
+        """Handle the scrollbar of the library view"""
+        if action == "moveto":
+            self.scroll_library_to(int(float(amount) * self.library_total))
+        else:
+            step = LIBRARY_VISIBLE_ROWS if unit == "pages" else 1
+            self.scroll_library_to(self.library_offset + int(amount) * step)
+
+    def on_library_mousewheel(self, event):
+        """Scroll the library view with the mouse wheel"""
+        direction = -1 if event.num == 4 or event.delta > 0 else 1
+        self.scroll_library_to(self.library_offset + direction * 3)
+        return "break"
 
     def on_select(self, event=None):
         """Handle game selection in library"""
@@ -427,17 +691,43 @@ class GoodGamesApp:
         if not selection:
             return
 
+        # Get selected game (ignore re-selection after scrolling)
+        game_id = self.tree.item(selection[0])['values'][0]
+        if game_id != self.selected_game_id:
+            self.show_game_details(game_id)
+
+    def show_game_details(self, game_id):
+        """Show a game in the details and overview panels"""
+        self.selected_game_id = game_id
+
         # Clear previous values
         self.clear_details()
 
-        # Get selected game
-        game_id = self.tree.item(selection[0])['values'][0]
         game = self.library.get_game_by_id(game_id)
 
         if game:
             self.update_details_view(game)
             self.update_overview_panel(game)
 
+    def patch_overview_panel(self, fields):
+        """Show the changed fields of the selected game in the overview panel"""
+        if 'status' in fields:
+            self.overview_status.config(text=fields['status'])
+        if 'rating' in fields:
+            self.overview_rating.config(text=fields['rating'] if fields['rating'] else "Not Rated")
+        if 'genre' in fields:
+            self.overview_genre.config(text=fields['genre'])
+        if 'completion_date' in fields:
+            completion_date = fields['completion_date']
+            self.overview_completion_date.config(
+                text=completion_date.strftime("%Y-%m-%d") if completion_date else "Not completed"
+            )
+        if 'review' in fields:
+            self.overview_review.configure(state='normal')
+            self.overview_review.delete("1.0", tk.END)
+            self.overview_review.insert("1.0", fields['review'])
+            self.overview_review.configure(state='disabled')
+
     def clear_details(self):
         """Clear all detail fields"""
         for label in [self.overview_title, self.overview_platform, self.overview_status, self.overview_rating,
@@ -0,0 +1,152 @@
+# persistence.py
+
+import atexit
+import queue
+import threading
+import time
+
+from storage import CSV_FIELDS, StorageConflictError
+
+REVIEW = CSV_FIELDS.index("review")
+
+
+class WriteBehindWriter:
+    """Writes library changes to a StorageEngine on a background thread.
+
+    Changes are queued by the caller and return immediately. Every burst of
+    queued changes is written as one batch: all new games with one insert_many
+    call and only the latest state of each changed game with one update_many
+    call. Changed reviews are their own operation: the writer hands them to
+    store_review() once their game is inserted and before writing the updated
+    rows, which then keep what it returned, so the caller's thread never
+    touches the review store either. Reviews moved to the review store are
+    put on moved_reviews so the owner can drop their text. The outcome of
+    every batch is put on the results queue so a GUI can pick it up from its
+    own thread.
+
+    With a commit_window (in seconds) the writer waits that long after the
+    first change of a burst before writing, so changes arriving close together
+    are group-committed: with durability "full" they cost one fsync instead of
+    one each.
+
+    If another process wrote to the storage in the meantime, the batch is kept
+    and conflict is set. The owner then reloads, takes the kept changes with
+    take_pending() and submits them again.
+    """
+
+    def __init__(self, storage, commit_window=0.0):
+        self.storage = storage
+        self.commit_window = commit_window
+        self.results = queue.Queue()  # {'ok': True, 'writes': n} or {'ok': False, 'error': message}
+        self._queue = queue.Queue()
+        self._retry = []  # Operations of a failed batch, written again with the next batch
+        self.moved_reviews = queue.Queue()  # (id, review text, value its row keeps) of reviews moved to the store
+        self._stored_reviews = {}  # id -> (review text, value its row keeps) of reviews we moved
+        self.conflict = False  # True while the kept batch conflicts with changes of another process
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="goodgames-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)  # Never lose queued changes when the program exits
+
+    def submit(self, operation, rows):
+        """Queue rows for writing; operation is "insert", "update" or "review" (rows of (id, review text))."""
+        if self._closed:
+            raise ValueError("Der Schreib-Thread wurde bereits beendet.")
+        self._queue.put((operation, rows))
+
+    def take_pending(self):
+        """Return and forget the operations kept after a conflict (call after flush())"""
+        pending, self._retry = self._retry, []
+        self.conflict = False
+        return pending
+
+    @property
+    def unsaved(self):
+        """Number of changes whose last write failed"""
+        return sum(len(rows) for _operation, rows in self._retry)
+
+    def flush(self):
+        """Block until every queued change has been written (or has failed); waits out the commit window"""
+        self._queue.join()
+
+    def close(self):
+        """Write all queued changes and stop the thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        atexit.unregister(self.close)
+        if self.unsaved:
+            print(f"Fehler: {self.unsaved} Änderungen konnten nicht gespeichert werden.")
+
+    def _run(self):
+        """Take bursts of changes from the queue and write each burst at once"""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.commit_window
+            while batch[-1] is not None:  # close() does not wait for the window
+                try:
+                    batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+            stop = None in batch
+            self._write([item for item in batch if item is not None])
+            for _item in batch:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, batch):
+        """Coalesce a batch of operations and write it to the storage"""
+        batch = self._retry + batch
+        if not batch:
+            return
+        reviews = {}  # id -> latest review text of games whose review changed
+        inserts = {}  # id -> row of games that are new in this batch
+        updates = {}  # id -> latest row of changed games
+        for operation, rows in batch:
+            for row in rows:
+                if operation == "review":
+                    reviews[row[0]] = row[1]
+                elif operation == "insert" or row[0] in inserts:
+                    inserts[row[0]] = row
+                else:
+                    updates[row[0]] = row
+        try:
+            if inserts:
+                # Reviews are stored under the id of their game, so a new game's review
+                # waits until its insert is committed and then follows as an update
+                self.storage.insert_many([list(row[:REVIEW]) + [None] + list(row[REVIEW + 1:])
+                                          if row[0] in reviews else row for row in inserts.values()])
+                updates.update((game_id, row) for game_id, row in inserts.items() if game_id in reviews)
+                inserts = {}
+            for game_id, review in list(reviews.items()):
+                stored = self.storage.store_review(game_id, review)
+                if stored != review:
+                    self._stored_reviews[game_id] = (review, stored)
+                    self.moved_reviews.put((game_id, review, stored))
+                else:
+                    self._stored_reviews.pop(game_id, None)
+                del reviews[game_id]
+            for row in updates.values():
+                review, stored = self._stored_reviews.get(row[0], (None, None))
+                if review is not None and row[REVIEW] == review:
+                    row[REVIEW] = stored  # Long reviews leave the row
+            if updates:
+                self.storage.update_many(list(updates.values()))
+                updates = {}
+            if self.storage.needs_compaction():
+                self.storage.compact_in_place()
+        except StorageConflictError as e:
+            self._retry = [("insert", list(inserts.values())), ("review", list(reviews.items())),
+                           ("update", list(updates.values()))]
+            self.conflict = True
+            self.results.put({'ok': False, 'conflict': True, 'error': str(e)})
+        except Exception as e:  # The thread must survive to write later batches
+            self._retry = [("insert", list(inserts.values())), ("review", list(reviews.items())),
+                           ("update", list(updates.values()))]
+            self.results.put({'ok': False, 'error': str(e)})
+        else:
+            self._retry = []
+            self.results.put({'ok': True, 'writes': sum(len(rows) for _operation, rows in batch)})
@@ -0,0 +1,145 @@
+# profiling.py
+
+import inspect
+import threading
+import time
+from functools import wraps
+
+# Storage methods that are timed, and how they report the rows they read or wrote
+STORAGE_METHODS = ("load", "iter_rows", "insert_many", "update_many", "compact", "compact_in_place")
+
+
+class Instrumentation:
+    """Records calls, latency and rows read/written per operation.
+
+    Methods are only wrapped while instrumentation is attached, so a library
+    without it runs the plain methods and pays nothing. Storage calls are
+    recorded as their own "storage.*" operations and their rows are also
+    credited to every library operation running on the same thread, so the
+    difference between e.g. load_from_csv and storage.load is the time spent
+    parsing rows.
+    """
+
+    def __init__(self):
+        self._stats = {}  # name -> [calls, total seconds, max seconds, rows read, rows written]
+        self._lock = threading.Lock()  # The write-behind thread records storage calls too
+        self._local = threading.local()  # Stack of the operations running on each thread
+        self._wrapped = []  # (object, attribute name) of every installed wrapper
+
+    def _active(self):
+        """Return the stack of operations running on the current thread"""
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, name, seconds):
+        """Add one call of an operation"""
+        with self._lock:
+            stats = self._stats.setdefault(name, [0, 0.0, 0.0, 0, 0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+
+    def _add_rows(self, name, read=0, written=0):
+        """Credit rows to an operation and to all operations it was called from"""
+        with self._lock:
+            for operation in {name, *self._active()}:
+                stats = self._stats.setdefault(operation, [0, 0.0, 0.0, 0, 0])
+                stats[3] += read
+                stats[4] += written
+
+    def _wrap(self, name, function):
+        """Return a wrapper that times function as operation name"""
+        if inspect.isgeneratorfunction(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                # Time the whole iteration, not just creating the generator
+                stack = self._active()
+                elapsed = 0.0
+                generator = function(*args, **kwargs)
+                try:
+                    while True:
+                        start = time.perf_counter()
+                        stack.append(name)
+                        try:
+                            item = next(generator)
+                        except StopIteration:
+                            return
+                        finally:
+                            stack.pop()
+                            elapsed += time.perf_counter() - start
+                        if name == "storage.iter_rows":
+                            self._add_rows(name, read=1)
+                        yield item
+                finally:
+                    self._record(name, elapsed)
+            return wrapper
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            stack = self._active()
+            stack.append(name)
+            start = time.perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            finally:
+                stack.pop()
+                self._record(name, time.perf_counter() - start)
+            if name == "storage.load":
+                self._add_rows(name, read=len(result))
+            elif name in ("storage.insert_many", "storage.update_many", "storage.compact") and args:
+                rows = args[0]
+                self._add_rows(name, written=len(rows) if hasattr(rows, "__len__") else 0)
+            return result
+        return wrapper
+
+    def attach(self, obj, names, prefix=""):
+        """Replace the given methods of obj by timed wrappers"""
+        for name in names:
+            method = getattr(obj, name, None)
+            if method is None or name in vars(obj):
+                continue  # Missing, or already wrapped
+            setattr(obj, name, self._wrap(prefix + name, method))
+            self._wrapped.append((obj, name))
+
+    def detach(self):
+        """Remove all wrappers so the objects run their plain methods again"""
+        for obj, name in self._wrapped:
+            vars(obj).pop(name, None)
+        self._wrapped = []
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        with self._lock:
+            self._stats = {}
+
+    def snapshot(self):
+        """Return {operation: {'calls', 'total_ms', 'max_ms', 'avg_ms', 'rows_read', 'rows_written'}}"""
+        with self._lock:
+            return {
+                name: {
+                    'calls': calls,
+                    'total_ms': total * 1000,
+                    'max_ms': longest * 1000,
+                    'avg_ms': total * 1000 / calls if calls else 0.0,
+                    'rows_read': read,
+                    'rows_written': written,
+                }
+                for name, (calls, total, longest, read, written) in self._stats.items()
+            }
+
+    def report(self):
+        """Return the snapshot as a table sorted by total time"""
+        lines = [f"{'Operation':<28}{'Calls':>8}{'Total ms':>12}{'Max ms':>10}{'Rows read':>11}{'Rows written':>14}"]
+        for name, stats in sorted(self.snapshot().items(), key=lambda item: -item[1]['total_ms']):
+            lines.append(
+                f"{name:<28}{stats['calls']:>8}{stats['total_ms']:>12.2f}{stats['max_ms']:>10.2f}"
+                f"{stats['rows_read']:>11}{stats['rows_written']:>14}"
+            )
+        return "\n".join(lines)
+
+
+def public_methods(cls):
+    """Return the names of the public methods defined by a class"""
+    return [name for name, attr in vars(cls).items() if not name.startswith("_") and inspect.isfunction(attr)]
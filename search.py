@@ -0,0 +1,317 @@
+# search.py
+
+import heapq
+import math
+import re
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from itertools import chain
+
+
+def _positional_trigrams(text):
+    """Yield the three-character substrings of a text, once per position"""
+    return (text[i:i + 3] for i in range(len(text) - 2))
+
+
+def _trigrams(text):
+    """Return the set of three-character substrings of a text"""
+    return set(_positional_trigrams(text))
+
+
+class TitleIndex:
+    """Case-insensitive substring search over game titles using a trigram index"""
+
+    def __init__(self):
+        self._titles = {}  # id -> casefolded title
+        self._postings = {}  # trigram -> set of ids
+        self._last_query = None  # Previous query and its result, used to refine type-ahead
+        self._last_result = None
+
+    def add(self, game_id, title):
+        """Index the title of a game"""
+        key = title.casefold()
+        self._titles[game_id] = key
+        for trigram in _trigrams(key):
+            self._postings.setdefault(trigram, set()).add(game_id)
+        self._last_query = None
+
+    def remove(self, game_id):
+        """Remove a game from the index"""
+        key = self._titles.pop(game_id, None)
+        if key is None:
+            return
+        for trigram in _trigrams(key):
+            ids = self._postings[trigram]
+            ids.discard(game_id)
+            if not ids:
+                del self._postings[trigram]
+        self._last_query = None
+
+    def search(self, query):
+        """Return the ids of all games whose title contains query (ignoring case)"""
+        query = query.casefold()
+        if not query:
+            return set(self._titles)
+
+        if self._last_query is not None and self._last_query in query:
+            # The query was extended: only the previous matches can still match
+            candidates = self._last_result
+        elif len(query) >= 3:
+            postings = sorted((self._postings.get(trigram, set()) for trigram in _trigrams(query)), key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+        else:
+            candidates = self._titles
+
+        result = {game_id for game_id in candidates if query in self._titles[game_id]}
+        self._last_query = query
+        self._last_result = result
+        return result
+
+
+def fuzzy_key(title):
+    """Reduce a title to the form compared by fuzzy matching.
+
+    Lowercases, drops punctuation and a leading "the" and collapses whitespace,
+    so "The Witcher 3 " and "witcher 3" get the same key.
+    """
+    words = "".join(char if char.isalnum() else " " for char in title.casefold()).split()
+    if len(words) > 1 and words[0] == "the":
+        words = words[1:]
+    return " ".join(words)
+
+
+def _pattern(text):
+    """Precompute the bit masks Myers' algorithm needs for one side of the comparison"""
+    match_masks = {}
+    for i, char in enumerate(text):
+        match_masks[char] = match_masks.get(char, 0) | (1 << i)
+    return match_masks, len(text)
+
+
+def _distance(pattern, text):
+    """Levenshtein distance between a precomputed pattern and a text (Myers' bit-parallel algorithm)"""
+    match_masks, length = pattern
+    if not length:
+        return len(text)
+    mask = (1 << length) - 1
+    last = 1 << (length - 1)
+    positive, negative, score = mask, 0, length
+    for char in text:
+        eq = match_masks.get(char, 0)
+        xv = eq | negative
+        xh = (((eq & positive) + positive) ^ positive) | eq
+        horizontal_positive = negative | (~(xh | positive) & mask)
+        horizontal_negative = positive & xh
+        if horizontal_positive & last:
+            score += 1
+        elif horizontal_negative & last:
+            score -= 1
+        horizontal_positive = (horizontal_positive << 1) | 1
+        horizontal_negative = horizontal_negative << 1
+        positive = (horizontal_negative | ~(xv | horizontal_positive)) & mask
+        negative = horizontal_positive & xv & mask
+    return score
+
+
+def edit_distance(a, b):
+    """Levenshtein distance between two strings"""
+    return _distance(_pattern(a), b)
+
+
+class FuzzyIndex:
+    """Finds all keys within an edit distance of a query using a trigram filter.
+
+    One edit changes at most three of the trigrams of a key (padded at both
+    ends), so a key within distance d of the query still contains one of any
+    trigrams of the query that cover more than 3 * d positions. Only the keys
+    found under the rarest such trigrams are compared with the edit distance.
+    Adding a key costs about as much as indexing a title in TitleIndex.
+    """
+
+    PAD = "\0\0"
+
+    def __init__(self):
+        self._keys = {}  # value -> key
+        self._postings = {}  # trigram -> set of values
+        self._by_length = {}  # key length -> set of values, for queries too short to filter
+        self.size = 0
+
+    def _trigrams(self, key):
+        """Return the padded trigrams of a key with the number of positions each occurs at"""
+        return Counter(_positional_trigrams(self.PAD + key + self.PAD))
+
+    def add(self, key, value):
+        """Insert a value under key"""
+        self.size += 1
+        self._keys[value] = key
+        postings = self._postings
+        for trigram in set(_positional_trigrams(self.PAD + key + self.PAD)):
+            ids = postings.get(trigram)
+            if ids is None:
+                postings[trigram] = {value}
+            else:
+                ids.add(value)
+        self._by_length.setdefault(len(key), set()).add(value)
+
+    def _candidates(self, key, max_distance):
+        """Return the values that may be within max_distance of key"""
+        needed = 3 * max_distance + 1  # Positions the chosen trigrams must cover
+        chosen = []
+        for trigram, positions in sorted(self._trigrams(key).items(),
+                                         key=lambda item: len(self._postings.get(item[0], ()))):
+            chosen.append(self._postings.get(trigram, set()))
+            needed -= positions
+            if needed <= 0:
+                return set().union(*chosen)
+        # Too short to filter by trigrams: compare with every key of a similar length
+        lengths = range(len(key) - max_distance, len(key) + max_distance + 1)
+        return set().union(*(self._by_length.get(length, set()) for length in lengths))
+
+    def search(self, key, max_distance):
+        """Return (distance, value) pairs for all keys within max_distance, closest first"""
+        pattern = _pattern(key)
+        matches = []
+        for value in self._candidates(key, max_distance):
+            other = self._keys[value]
+            if abs(len(other) - len(key)) <= max_distance:
+                distance = _distance(pattern, other)
+                if distance <= max_distance:
+                    matches.append((distance, value))
+        matches.sort()
+        return matches
+
+
+class SortedIndex:
+    """Game ids ordered by a sort key, kept in order on every change.
+
+    Entries are ((0, key), id), or ((1,), id) for games without a key, so those
+    come after all others and ties are broken by id. A page is cut straight out
+    of the entry list, so the first rows of an ordering never need a sort.
+    """
+
+    def __init__(self, items=()):
+        """Build the index from (id, key or None) pairs"""
+        self._entries = sorted(self.entry(game_id, key) for game_id, key in items)
+        self._missing = sum(1 for (rank, _game_id) in self._entries if len(rank) == 1)  # Entries without key
+
+    @staticmethod
+    def entry(game_id, key):
+        """Return the entry a game with this key has in the index"""
+        return ((1,) if key is None else (0, key)), game_id
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, game_id, key):
+        """Insert a game"""
+        insort(self._entries, self.entry(game_id, key))
+        self._missing += key is None
+
+    def remove(self, game_id, key):
+        """Remove a game (key must be the one it was added with)"""
+        entry = self.entry(game_id, key)
+        position = bisect_left(self._entries, entry)
+        if position < len(self._entries) and self._entries[position] == entry:
+            del self._entries[position]
+            self._missing -= key is None
+
+    def position_after(self, entry, descending=False):
+        """Return the position that follows entry in the given order (entry need not exist anymore)"""
+        present = len(self._entries) - self._missing
+        position = bisect_left(self._entries, entry)
+        if descending and position < present:
+            return present - position  # Everything with a larger key came before
+        return bisect_right(self._entries, entry)
+
+    def iter_ids(self, start=0, descending=False):
+        """Yield the ids in key order (or reversed key order) from position start on; ids without key come last"""
+        entries = self._entries
+        if descending:
+            present = len(entries) - self._missing
+            positions = chain(range(present - 1 - start, -1, -1), range(max(start, present), len(entries)))
+        else:
+            positions = range(start, len(entries))
+        return (entries[position][1] for position in positions)
+
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Split a text into lowercase words"""
+    return _WORD.findall(text.casefold()) if text else []
+
+
+class FullTextIndex:
+    """Inverted index over titles and reviews, ranked with BM25.
+
+    Every game is one document; title words count TITLE_WEIGHT times because a
+    match in the title says more than one in a long review. Changing a game
+    only replaces the postings of that one document.
+    """
+
+    TITLE_WEIGHT = 2
+    K1 = 1.2  # How quickly repeated words stop adding to the score
+    B = 0.75  # How strongly long documents are penalized
+
+    def __init__(self):
+        self._postings = {}  # word -> {id: number of occurrences}
+        self._lengths = {}  # id -> number of words in the document
+        self._total_length = 0
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def add(self, game_id, title, review):
+        """Index the title and review of a game"""
+        counts = Counter(tokenize(review))
+        for word in tokenize(title):
+            counts[word] += self.TITLE_WEIGHT
+        for word, count in counts.items():
+            self._postings.setdefault(word, {})[game_id] = count
+        length = sum(counts.values())
+        self._lengths[game_id] = length
+        self._total_length += length
+
+    def remove(self, game_id, title, review):
+        """Remove a game (title and review must be the indexed ones)"""
+        length = self._lengths.pop(game_id, None)
+        if length is None:
+            return
+        self._total_length -= length
+        for word in set(tokenize(title)) | set(tokenize(review)):
+            documents = self._postings.get(word)
+            if documents is not None:
+                documents.pop(game_id, None)
+                if not documents:
+                    del self._postings[word]
+
+    def search(self, query, limit=20):
+        """Return up to limit (score, id) pairs for the documents matching any word of query, best first"""
+        if not self._lengths:
+            return []
+        count = len(self._lengths)
+        average_length = self._total_length / count or 1
+        lengths = self._lengths
+        terms = []  # (postings, idf) of the known query words, rarest first
+        for word in set(tokenize(query)):
+            documents = self._postings.get(word)
+            if documents:
+                terms.append((documents, math.log(1 + (count - len(documents) + 0.5) / (len(documents) + 0.5))))
+        terms.sort(key=lambda term: len(term[0]))
+
+        # A word adds at most idf * (K1 + 1) to a score. Once the words left cannot lift an unseen
+        # document into the top results, their long postings are only looked up for seen documents.
+        bound = sum(idf for _documents, idf in terms) * (self.K1 + 1)
+        scores = {}
+        for documents, idf in terms:
+            if len(scores) >= limit and heapq.nlargest(limit, scores.values())[-1] >= bound:
+                matches = [(game_id, documents[game_id]) for game_id in scores if game_id in documents]
+            else:
+                matches = documents.items()
+            for game_id, occurrences in matches:
+                norm = self.K1 * (1 - self.B + self.B * lengths[game_id] / average_length)
+                scores[game_id] = scores.get(game_id, 0.0) + idf * occurrences * (self.K1 + 1) / (occurrences + norm)
+            bound -= idf * (self.K1 + 1)
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(score, game_id) for game_id, score in best]
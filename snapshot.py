@@ -0,0 +1,110 @@
+# snapshot.py
+"""Binary snapshot of a game library for fast startup.
+
+The snapshot stores the rows column by column: ids and dates (as day
+ordinals) in packed arrays, the repeated category strings (platform, status,
+rating, genre) once in a string table with packed indexes, and titles and
+reviews as plain string lists. The header holds the signature of the source
+files the rows were read from and a CRC32 of the payload, so a snapshot that
+is stale or damaged is never used. The CSV stays the readable source of truth.
+"""
+
+import marshal
+import os
+import struct
+import sys
+import zlib
+from array import array
+from datetime import date, datetime
+
+MAGIC = b"GGSNAP01"
+# magic, marshal version, csv mtime, csv size, journal mtime, journal size, journal entries, payload crc32
+HEADER = struct.Struct("<8sI5qI")
+CATEGORY_COLUMNS = (2, 3, 4, 5)  # platform, status, rating, genre
+
+
+def _pack_signature(signature):
+    """Flatten a ((mtime, size) or None, (mtime, size) or None) signature to four integers"""
+    csv_stat, journal_stat = signature
+    return (*(csv_stat or (-1, -1)), *(journal_stat or (-1, -1)))
+
+
+def _ordinal(value):
+    """Return the day ordinal of a date, YYYY-MM-DD string or empty value (0)"""
+    if value is None or value == "":
+        return 0
+    if isinstance(value, date):
+        return value.toordinal()
+    return datetime.strptime(value, "%Y-%m-%d").toordinal()
+
+
+def write_snapshot(path, rows, signature, journal_entries=0):
+    """Write rows to a snapshot file that is valid while the sources have the given signature"""
+    strings = {"": 0}  # Category string -> index in the string table
+    ids = array("q")
+    categories = [[] for _column in CATEGORY_COLUMNS]
+    added, completed = array("i"), array("i")
+    titles, reviews = [], []
+    for row in rows:
+        ids.append(int(row[0]))
+        titles.append(row[1])
+        reviews.append(row[6] or "")
+        for column, values in zip(CATEGORY_COLUMNS, categories):
+            value = "" if row[column] is None else str(row[column])
+            values.append(strings.setdefault(value, len(strings)))
+        added.append(_ordinal(row[7]))
+        completed.append(_ordinal(row[8]))
+
+    typecode = "H" if len(strings) <= 0xFFFF else "I"
+    payload = marshal.dumps((
+        list(strings), typecode, ids.tobytes(),
+        [array(typecode, values).tobytes() for values in categories],
+        added.tobytes(), completed.tobytes(), titles, reviews,
+    ))
+    header = HEADER.pack(MAGIC, marshal.version, *_pack_signature(signature), journal_entries, zlib.crc32(payload))
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as file:
+        file.write(header)
+        file.write(payload)
+    os.replace(temp_path, path)  # Readers see the old or the new snapshot, never half of one
+
+
+def read_snapshot(path, signature):
+    """Return (rows, journal entries) from a snapshot, or None if it is missing, stale or damaged.
+
+    Rows are tuples in CSV_FIELDS order with an integer id, interned category
+    strings and date objects (or None) for the dates.
+    """
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except FileNotFoundError:
+        return None
+    if len(data) < HEADER.size:
+        return None
+    magic, version, *packed_signature, journal_entries, checksum = HEADER.unpack_from(data)
+    if magic != MAGIC or version != marshal.version or tuple(packed_signature) != _pack_signature(signature):
+        return None
+    payload = memoryview(data)[HEADER.size:]
+    if zlib.crc32(payload) != checksum:
+        return None
+    try:
+        strings, typecode, ids, categories, added, completed, titles, reviews = marshal.loads(payload)
+    except (EOFError, ValueError, TypeError):
+        return None
+
+    strings = [sys.intern(value) for value in strings]
+    platforms, statuses, ratings, genres = (
+        map(strings.__getitem__, array(typecode, values)) for values in categories
+    )
+    added, completed = array("i", added), array("i", completed)
+    dates = {0: None}  # Ordinal -> shared date object
+    for ordinal in set(added) | set(completed):
+        if ordinal:
+            dates[ordinal] = date.fromordinal(ordinal)
+    # zip and map build the rows without running Python code per row
+    rows = list(zip(
+        array("q", ids), titles, platforms, statuses, ratings, genres, reviews,
+        map(dates.__getitem__, added), map(dates.__getitem__, completed),
+    ))
+    return rows, journal_entries
@@ -0,0 +1,703 @@
+# storage.py
+
+import csv
+import os
+import re
+import sqlite3
+import struct
+import threading
+import zlib
+from contextlib import contextmanager
+
+from snapshot import read_snapshot, write_snapshot
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+CSV_FIELDS = ["id", "title", "platform", "status", "rating", "genre", "review", "date_added", "completion_date"]
+# Review field of a row whose review text is kept in the ReviewStore
+REVIEW_IN_STORE = "@@review@@"
+# "off": never fsync. "normal": fsync rewritten files before they replace the old ones.
+# "full": also fsync every append, so a write that returned survives a power failure.
+DURABILITY_LEVELS = ("off", "normal", "full")
+ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def check_durability(durability):
+    """Raise ValueError for an unknown durability level"""
+    if durability not in DURABILITY_LEVELS:
+        print(f"Fehler: Unbekannte Durability '{durability}', erlaubt sind {', '.join(DURABILITY_LEVELS)}.")
+        raise ValueError(f"Unbekannte Durability '{durability}'.")
+
+
+def _fsync_directory(path):
+    """Make a file created or renamed in the directory of path durable"""
+    if os.name != "posix":
+        return  # Directories cannot be opened on Windows; NTFS journals renames itself
+    descriptor = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def atomic_write(path, write, mode="w", sync=True):
+    """Write a file through a temporary file that replaces path only when it is complete.
+
+    write(file) fills the temporary file. With sync the data reaches the disk
+    before the rename and the rename before returning, so after a crash path
+    holds either the old or the new content.
+    """
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, mode, newline=None if "b" in mode else "\n") as file:
+            write(file)
+            if sync:
+                file.flush()
+                os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    if sync:
+        _fsync_directory(path)
+
+
+def _complete_length(path):
+    """Return the size of a file without a last line that has no newline (cut off by a crash)"""
+    with open(path, "rb") as file:
+        position = file.seek(0, os.SEEK_END)
+        while position > 0:
+            start = max(position - 4096, 0)
+            file.seek(start)
+            newline = file.read(position - start).rfind(b"\n")
+            if newline >= 0:
+                return start + newline + 1
+            position = start
+        return 0
+
+
+def _complete_lines(file, keep_whole_row=False):
+    """Yield the lines of a text file, leaving out a last line that has no newline.
+
+    Every write ends its rows with a newline, so a last line without one was
+    cut off by a crash. It may still have all fields (cut inside the last one)
+    and must not be parsed. With keep_whole_row such a line is kept if it
+    parses as a complete row, because editors may save games.csv without a
+    final newline.
+    """
+    for line in file:
+        if line.endswith("\n") or (keep_whole_row and _is_whole_row(line)):
+            yield line
+
+
+def _is_complete(row):
+    """Return True for a CSV row with an id and all fields"""
+    return len(row) >= len(CSV_FIELDS) and row[0].isdigit()
+
+
+def _is_whole_row(line):
+    """Return True if a line without newline holds exactly one game row ending in a full (or empty) date"""
+    try:
+        rows = list(csv.reader([line]))
+    except csv.Error:
+        return False
+    if len(rows) != 1 or len(rows[0]) != len(CSV_FIELDS) or not _is_complete(rows[0]):
+        return False
+    return rows[0][-1] == "" or ISO_DATE.fullmatch(rows[0][-1]) is not None
+
+
+def _end_last_line(path, keep_whole_row=False):
+    """Make a file end with a newline before appending to it; returns its new size.
+
+    A last line without newline is cut off (see _complete_lines), unless
+    keep_whole_row is set and it is a complete row: then the newline is added.
+    """
+    complete = _complete_length(path)
+    with open(path, "rb+") as file:
+        file.seek(complete)
+        tail = file.read()
+        if not tail:
+            return complete
+        if keep_whole_row and _is_whole_row(tail.decode("utf-8", "replace")):
+            file.write(b"\n" if tail.endswith(b"\r") else b"\r\n")
+            return file.tell()
+        file.truncate(complete)
+        return complete
+
+
+class StorageEngine:
+    """Interface for the persistence of a GameLibrary.
+
+    Engines exchange rows as lists (or tuples) in CSV_FIELDS order. Values are strings
+    (or None/"" for empty fields) except for the id, which may be an integer,
+    and the dates, which may be date objects.
+    """
+
+    def load(self):
+        """Return all rows with every recorded change applied"""
+        raise NotImplementedError
+
+    def iter_rows(self):
+        """Yield the rows one by one without loading all of them"""
+        yield from self.load()
+
+    def insert(self, row):
+        """Persist a new game"""
+        raise NotImplementedError
+
+    def insert_many(self, rows):
+        """Persist several new games at once"""
+        for row in rows:
+            self.insert(row)
+
+    def update(self, row):
+        """Persist the new state of an existing game"""
+        raise NotImplementedError
+
+    def update_many(self, rows):
+        """Persist the new state of several games at once"""
+        for row in rows:
+            self.update(row)
+
+    def has_changed(self):
+        """Return True if someone else changed the storage since our last load or write"""
+        return False
+
+    def needs_compaction(self):
+        """Return True if compact() should be called"""
+        return False
+
+    def compact(self, rows):
+        """Replace the stored data with the given rows"""
+
+    def compact_in_place(self):
+        """Compact using the data already in the storage"""
+        self.compact(self.load())
+
+    def save_snapshot(self, rows):
+        """Keep a copy of the current rows that loads faster than the storage itself (optional)"""
+
+    def store_review(self, game_id, review):
+        """Store the review of a game and return what its row keeps in the review field"""
+        return review
+
+    def load_review(self, game_id, stored):
+        """Return the review text of a game from the value of its review field"""
+        return stored
+
+    def close(self):
+        """Release all resources held by the engine"""
+
+
+class StorageConflictError(Exception):
+    """Raised when another process changed the storage since we last read it"""
+
+
+class FileLock:
+    """Advisory lock on a separate lock file, shared by all processes using the same storage"""
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.Lock()  # flock does not exclude threads sharing one file object
+        self._file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        try:
+            self._file = open(self.path, "a+")
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+        except OSError:
+            if self._file is not None:
+                self._file.close()
+            self._thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+            self._thread_lock.release()
+
+
+class ReviewStore:
+    """Append-only file of review texts, read only when a review is shown.
+
+    Every record is a header (game id, length, flags) followed by the UTF-8
+    text, zlib-compressed when compress is set. The latest record of a game
+    wins. Only the offsets are kept in memory; the file is compacted when most
+    of it consists of replaced reviews. A record cut off by a crash is ignored
+    and overwritten by the next put().
+    """
+
+    HEADER = struct.Struct("<QIB")  # game id, length of the text, flags
+    COMPRESSED = 1
+    COMPACT_MIN_BYTES = 1 << 20  # Never compact files smaller than this
+
+    def __init__(self, path, compress=False, durability="normal"):
+        check_durability(durability)
+        self.path = path
+        self.compress = compress
+        self.durability = durability
+        self.lock = FileLock(path + ".lock")
+        self._offsets = {}  # game id -> (offset of the text, length, flags)
+        self._signature = None  # (inode, end of the last complete record) up to which _offsets is complete
+        self._live_bytes = 0
+
+    def _refresh(self):
+        """Read the headers appended since the last call, or all of them after a compaction (hold the lock)"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._offsets, self._signature, self._live_bytes = {}, None, 0
+            return
+        if self._signature is not None and self._signature[0] == stat.st_ino and self._signature[1] <= stat.st_size:
+            start = self._signature[1]
+        else:
+            self._offsets, self._live_bytes, start = {}, 0, 0
+        end = start
+        with open(self.path, "rb") as file:
+            file.seek(start)
+            while True:
+                header = file.read(self.HEADER.size)
+                if len(header) < self.HEADER.size:
+                    break  # End of file (or a header cut off by a crash)
+                game_id, length, flags = self.HEADER.unpack(header)
+                if end + self.HEADER.size + length > stat.st_size:
+                    break  # Text cut off by a crash
+                old = self._offsets.get(game_id)
+                self._live_bytes += length - (old[1] if old else 0)
+                self._offsets[game_id] = (file.tell(), length, flags)
+                end = file.seek(length, os.SEEK_CUR)
+        self._signature = (stat.st_ino, end)
+
+    def get(self, game_id):
+        """Return the review of a game or None"""
+        with self.lock:
+            self._refresh()
+            location = self._offsets.get(game_id)
+            if location is None:
+                return None
+            offset, length, flags = location
+            with open(self.path, "rb") as file:
+                file.seek(offset)
+                data = file.read(length)
+        if flags & self.COMPRESSED:
+            data = zlib.decompress(data)
+        return data.decode("utf-8")
+
+    def put(self, game_id, review):
+        """Store the review of a game, replacing an older one"""
+        data = review.encode("utf-8")
+        flags = 0
+        if self.compress:
+            data, flags = zlib.compress(data), self.COMPRESSED
+        with self.lock:
+            self._refresh()
+            end = self._signature[1] if self._signature else 0
+            created = not os.path.exists(self.path)
+            with open(self.path, "ab") as file:
+                if file.tell() > end:
+                    file.truncate(end)  # Drop a record cut off by a crash
+                file.write(self.HEADER.pack(game_id, len(data), flags) + data)
+                if self.durability == "full":
+                    file.flush()
+                    os.fsync(file.fileno())
+            if created and self.durability == "full":
+                _fsync_directory(self.path)
+            self._refresh()
+            size = self._signature[1]
+            if size > self.COMPACT_MIN_BYTES and self._live_bytes < size // 2:
+                self._compact()
+
+    def _compact(self):
+        """Rewrite the file with only the latest review of every game (hold the lock)"""
+        with open(self.path, "rb") as source:
+            def write(target):
+                for game_id, (offset, length, flags) in self._offsets.items():
+                    source.seek(offset)
+                    target.write(self.HEADER.pack(game_id, length, flags) + source.read(length))
+            atomic_write(self.path, write, "wb", sync=self.durability != "off")
+        self._signature = None
+        self._refresh()
+
+
+class CsvStorage(StorageEngine):
+    """Stores games in a CSV snapshot plus an append-only journal of updates.
+
+    Writes are safe between processes: every write takes an advisory lock and
+    first checks that the files still have the signature we last saw. If they
+    don't, StorageConflictError is raised and the caller has to reload.
+
+    save_snapshot() writes a binary copy of the rows next to the CSV file.
+    load() uses it as long as the CSV file and the journal are unchanged.
+
+    Reviews longer than review_limit characters are kept in a ReviewStore
+    (games.csv.reviews) and the row only holds REVIEW_IN_STORE, so loading and
+    rewriting the CSV file never touches long texts.
+
+    The CSV file is never rewritten in place: compaction writes a temporary file
+    and renames it over the old one. durability (see DURABILITY_LEVELS) decides
+    which writes are fsynced. A last line without a newline was cut off by a
+    crash during an append: it is ignored when loading and removed before the
+    next append. Rows sharing an id (e.g. after editing the file by hand) get
+    the next free ids when loading, and the file is rewritten with them.
+    """
+
+    def __init__(self, csv_path="games.csv", journal_limit=1000, use_snapshot=True, review_limit=200,
+                 compress_reviews=False, durability="normal"):
+        check_durability(durability)
+        self.csv_path = csv_path
+        self.journal_path = csv_path + ".journal"
+        self.snapshot_path = csv_path + ".snap" if use_snapshot else None
+        self.durability = durability
+        self.review_limit = review_limit  # None keeps all reviews in the CSV file
+        self.reviews = ReviewStore(csv_path + ".reviews", compress_reviews, durability)
+        self.journal_limit = journal_limit  # Compact after this many journaled updates
+        self.lock = FileLock(csv_path + ".lock")
+        self._journal_entries = 0
+        self._signature = None  # (mtime, size) of the CSV file and journal as we last saw them
+
+    @staticmethod
+    def _stat(path):
+        """Return (mtime, size) of a file or None if it does not exist"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _file_signature(self):
+        """Return the signatures of the CSV file and its journal"""
+        return self._stat(self.csv_path), self._stat(self.journal_path)
+
+    def has_changed(self):
+        return self._file_signature() != self._signature
+
+    def _check_unchanged(self):
+        """Raise StorageConflictError if someone else wrote since our last load or write (hold the lock)"""
+        if self._file_signature() != self._signature:
+            raise StorageConflictError(f"Datei {self.csv_path} wurde von einem anderen Prozess geändert.")
+
+    def _read_rows(self):
+        """Read the CSV snapshot with the journal applied; returns (rows, journal entries, renumbered).
+
+        Rows sharing an id with an earlier row (e.g. from editing games.csv by hand)
+        are kept and get the next free ids; renumbered lists (old id, new id) of them.
+        Journaled updates belong to the first row with their id.
+        """
+        with open(self.csv_path, "r", newline="\n") as file:
+            reader = csv.reader(_complete_lines(file, keep_whole_row=True))
+            next(reader, None)  # Skip header
+            rows = [row for row in reader if _is_complete(row)]
+        journal, entries = self._read_journal()
+        next_id = max([int(row[0]) for row in rows] + list(journal), default=0) + 1
+        positions = {}  # id -> index of its row
+        renumbered = []
+        for index, row in enumerate(rows):
+            game_id = int(row[0])
+            if game_id in positions:
+                renumbered.append((game_id, next_id))
+                rows[index] = row = [str(next_id)] + row[1:]
+                game_id = next_id
+                next_id += 1
+            positions[game_id] = index
+        for game_id, row in journal.items():
+            if game_id in positions:
+                rows[positions[game_id]] = row
+            else:
+                rows.append(row)
+        return rows, entries, renumbered
+
+    def _renumber_duplicates(self, rows, renumbered):
+        """Save the new ids _read_rows() gave to rows sharing an id (hold the lock)"""
+        print(f"Fehler: Mehrfach vergebene IDs in {self.csv_path}, neu vergeben: "
+              f"{', '.join(f'{old} -> {new}' for old, new in renumbered)}")
+        old_ids = {new_id: old_id for old_id, new_id in renumbered}
+        review = CSV_FIELDS.index("review")
+        try:
+            for row in rows:
+                if int(row[0]) in old_ids and row[review] == REVIEW_IN_STORE:
+                    self.reviews.put(int(row[0]), self.reviews.get(old_ids[int(row[0])]) or "")
+            self._write_snapshot(rows)
+        except OSError as e:
+            print(f"Fehler: Datei {self.csv_path} konnte nicht geschrieben werden: {e}")
+
+    def load(self):
+        """Load the CSV snapshot and replay the journal on top of it."""
+        try:
+            with self.lock:
+                signature = self._file_signature()
+                cached = read_snapshot(self.snapshot_path, signature) if self.snapshot_path else None
+                if cached is not None:
+                    rows, self._journal_entries = cached
+                else:
+                    rows, self._journal_entries, renumbered = self._read_rows()
+                    if renumbered:
+                        self._renumber_duplicates(rows, renumbered)
+                        signature = self._file_signature()
+            self._signature = signature
+            return rows
+        except FileNotFoundError:
+            print(f"Fehler: Datei {self.csv_path} wurde nicht gefunden.")
+            self._signature = self._file_signature()  # The first insert creates the file with its header
+            self._journal_entries = 0
+            return []
+
+    def _read_journal(self):
+        """Return the latest journaled row of every updated game by id and the number of entries"""
+        rows = {}
+        entries = 0
+        try:
+            with open(self.journal_path, "r", newline="\n") as file:
+                for row in csv.reader(_complete_lines(file)):
+                    if _is_complete(row):
+                        rows[int(row[0])] = row
+                        entries += 1
+        except FileNotFoundError:
+            pass  # No updates since the last compaction
+        return rows, entries
+
+    def iter_rows(self):
+        """Stream the CSV snapshot, replacing rows that were updated in the journal."""
+        journal, _entries = self._read_journal()  # Bounded by journal_limit
+        try:
+            with open(self.csv_path, "r", newline="\n") as file:
+                reader = csv.reader(_complete_lines(file, keep_whole_row=True))
+                next(reader, None)  # Skip header
+                for row in reader:
+                    if _is_complete(row):
+                        yield journal.pop(int(row[0]), row)
+        except FileNotFoundError:
+            print(f"Fehler: Datei {self.csv_path} wurde nicht gefunden.")
+        yield from journal.values()
+
+    def _append(self, path, rows):
+        """Append rows to a file under the lock after checking for concurrent changes"""
+        with self.lock:
+            self._check_unchanged()
+            created = not os.path.exists(path)
+            size = 0
+            if not created:
+                # Drop a line a crash cut off (load() ignores it too) or end the last row an editor saved
+                size = _end_last_line(path, keep_whole_row=path == self.csv_path)
+            with open(path, "a", newline="\n") as file:
+                writer = csv.writer(file)
+                if path == self.csv_path and not size:
+                    writer.writerow(CSV_FIELDS)  # New (or emptied) CSV file: load() skips the first line
+                writer.writerows(rows)
+                if self.durability == "full":
+                    file.flush()
+                    os.fsync(file.fileno())
+            if created and self.durability == "full":
+                _fsync_directory(path)
+            self._signature = self._file_signature()
+
+    def insert(self, row):
+        """Append a game to the CSV file."""
+        self.insert_many([row])
+
+    def insert_many(self, rows):
+        """Append several games to the CSV file in one buffered write."""
+        try:
+            self._append(self.csv_path, rows)
+        except FileNotFoundError:
+            print(f"Fehler: Datei {self.csv_path} wurde nicht gefunden.")
+            raise
+
+    def update(self, row):
+        """Record an update of a game in the append-only journal."""
+        self.update_many([row])
+
+    def update_many(self, rows):
+        """Record updates of several games in the journal in one write."""
+        try:
+            self._append(self.journal_path, rows)
+            self._journal_entries += len(rows)
+        except FileNotFoundError:
+            print(f"Fehler: Datei {self.journal_path} konnte nicht geschrieben werden.")
+            raise
+
+    def needs_compaction(self):
+        return self._journal_entries >= self.journal_limit
+
+    def store_review(self, game_id, review):
+        """Move a long review to the review store; short ones stay in the row."""
+        if not review or self.review_limit is None or len(review) <= self.review_limit:
+            return review
+        self.reviews.put(game_id, review)
+        return REVIEW_IN_STORE
+
+    def load_review(self, game_id, stored):
+        """Read the review from the review store if the row only holds a reference."""
+        if stored == REVIEW_IN_STORE:
+            return self.reviews.get(game_id)
+        return stored
+
+    def save_snapshot(self, rows):
+        """Write the binary snapshot if rows are the current content of the CSV file and journal."""
+        if not self.snapshot_path:
+            return
+        try:
+            with self.lock:
+                if self._file_signature() != self._signature:
+                    return  # Someone else wrote since our last load: rows are outdated
+                write_snapshot(self.snapshot_path, rows, self._signature, self._journal_entries)
+        except OSError as e:
+            print(f"Fehler: Snapshot {self.snapshot_path} konnte nicht geschrieben werden: {e}")
+
+    def _write_snapshot(self, rows):
+        """Rewrite the CSV file from rows and remove the journal (hold the lock)"""
+        def write(file):
+            writer = csv.writer(file)
+            writer.writerow(CSV_FIELDS)
+            writer.writerows(rows)
+
+        atomic_write(self.csv_path, write, sync=self.durability != "off")
+        # A crash before the journal is gone only replays updates the new file already contains
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._journal_entries = 0
+        self._signature = self._file_signature()
+
+    def compact(self, rows):
+        """Write a fresh CSV snapshot and remove the journal."""
+        try:
+            with self.lock:
+                self._check_unchanged()
+                self._write_snapshot(rows)
+        except FileNotFoundError:
+            print(f"Fehler: Datei {self.csv_path} wurde nicht gefunden.")
+            raise
+
+    def compact_in_place(self):
+        """Fold the journal into the CSV file using the data on disk."""
+        try:
+            with self.lock:
+                self._check_unchanged()
+                rows, _entries, _renumbered = self._read_rows()
+                self._write_snapshot(rows)
+        except FileNotFoundError:
+            print(f"Fehler: Datei {self.csv_path} wurde nicht gefunden.")
+            raise
+
+
+class SqliteStorage(StorageEngine):
+    """Stores games in an SQLite database in WAL mode"""
+
+    def __init__(self, db_path="games.db", durability="normal"):
+        check_durability(durability)
+        self.db_path = db_path
+        # The connection may be handed to a WriteBehindWriter thread, which then is its only user
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(f"PRAGMA synchronous={durability.upper()}")
+        with self.connection:
+            self.connection.execute(
+                """CREATE TABLE IF NOT EXISTS games (
+                       id INTEGER PRIMARY KEY,
+                       title TEXT NOT NULL,
+                       platform TEXT,
+                       status TEXT,
+                       rating TEXT,
+                       genre TEXT,
+                       review TEXT,
+                       date_added TEXT,
+                       completion_date TEXT
+                   )"""
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS games_title ON games (title)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS games_status ON games (status)")
+        self._data_version = None
+
+    @staticmethod
+    def _to_db(row):
+        """Convert a row to SQL parameters, storing empty fields as NULL"""
+        return [row[0]] + [None if value is None or value == "" else str(value) for value in row[1:]]
+
+    def _current_data_version(self):
+        """Return the counter SQLite increments when another connection commits"""
+        return self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def has_changed(self):
+        return self._current_data_version() != self._data_version
+
+    def load(self):
+        rows = self.connection.execute(f"SELECT {', '.join(CSV_FIELDS)} FROM games ORDER BY id").fetchall()
+        self._data_version = self._current_data_version()
+        return [list(row) for row in rows]
+
+    def iter_rows(self):
+        for row in self.connection.execute(f"SELECT {', '.join(CSV_FIELDS)} FROM games ORDER BY id"):
+            yield list(row)
+
+    def get(self, game_id):
+        """Return the row of a single game using the primary key index"""
+        row = self.connection.execute(
+            f"SELECT {', '.join(CSV_FIELDS)} FROM games WHERE id = ?", (game_id,)
+        ).fetchone()
+        return list(row) if row else None
+
+    @contextmanager
+    def _transaction(self):
+        """Run a write transaction after checking that no other connection committed in between"""
+        self.connection.execute("BEGIN IMMEDIATE")  # Takes SQLite's write lock
+        try:
+            if self._current_data_version() != self._data_version:
+                raise StorageConflictError(f"Datenbank {self.db_path} wurde von einem anderen Prozess geändert.")
+            yield self.connection
+            self.connection.commit()
+        except BaseException:
+            self.connection.rollback()
+            raise
+
+    def insert(self, row):
+        self.insert_many([row])
+
+    def insert_many(self, rows):
+        with self._transaction() as connection:
+            connection.executemany(
+                f"INSERT INTO games ({', '.join(CSV_FIELDS)}) VALUES ({', '.join('?' * len(CSV_FIELDS))})",
+                (self._to_db(row) for row in rows),
+            )
+
+    def update(self, row):
+        self.update_many([row])
+
+    def update_many(self, rows):
+        with self._transaction() as connection:
+            connection.executemany(
+                f"UPDATE games SET {', '.join(field + ' = ?' for field in CSV_FIELDS[1:])} WHERE id = ?",
+                (values[1:] + values[:1] for values in map(self._to_db, rows)),
+            )
+
+    def compact(self, rows):
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM games")
+            connection.executemany(
+                f"INSERT INTO games ({', '.join(CSV_FIELDS)}) VALUES ({', '.join('?' * len(CSV_FIELDS))})",
+                (self._to_db(row) for row in rows),
+            )
+        self.compact_in_place()
+
+    def compact_in_place(self):
+        """Move the write-ahead log back into the database file"""
+        self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        self.connection.close()
@@ -1,14 +1,37 @@
+import csv
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 import unittest
-from backend import GameLibrary
+from datetime import date
+from unittest import mock
+import analytics
+import export
+from backend import GameLibrary, Game, stream_games
+from search import FuzzyIndex, edit_distance, fuzzy_key
+from storage import CSV_FIELDS, REVIEW_IN_STORE, CsvStorage, ReviewStore, SqliteStorage
 
 
-class TestGameLibrary(unittest.TestCase):
+class TempLibraryTestCase(unittest.TestCase):
+    """Basisklasse für Tests mit einer leeren games.csv in einem temporären Verzeichnis."""
+
     def setUp(self):
-        """Initialisiere eine neue GameLibrary für jeden Test."""
-        self.library = GameLibrary()
-        self.library.games = []  # Leere die Bibliothek für saubere Tests
-        self.library.next_id = 1
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp_dir.name, "games.csv")
+        with open(self.csv_path, "w", newline="\n") as file:
+            file.write("id,title,platform,status,rating,genre,review,date_added,completion_date\n")
+        self.library = GameLibrary(self.csv_path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
 
+class TestGameLibrary(TempLibraryTestCase):
     def test_add_game(self):
         """Testet das Hinzufügen eines neuen Spiels."""
         game = self.library.add_game("The Witcher 3", "PC")
@@ -37,5 +60,1045 @@ class TestGameLibrary(unittest.TestCase):
         self.assertEqual(fetched_game['platform'], "PC")
 
 
+class TestGameLibraryIndexes(TempLibraryTestCase):
+
+    def test_duplicate_title_is_normalized(self):
+        """Testet, dass Titel unabhängig von Groß-/Kleinschreibung eindeutig sind."""
+        self.library.add_game("Hades", "PC")
+        with self.assertRaises(ValueError):
+            self.library.add_game("  hades ", "Switch")
+        self.assertEqual(len(self.library.games), 1)
+
+    def test_indexes_follow_games_assignment(self):
+        """Testet, dass die Indizes beim Setzen von games neu aufgebaut werden."""
+        self.library.add_game("Celeste", "PC")
+        self.library.games = [Game(7, "Portal 2", "PC")]
+        self.assertEqual(self.library.get_game_by_id(7)['title'], "Portal 2")
+        with self.assertRaises(ValueError):
+            self.library.get_game_by_id(1)
+        self.library.add_game("Celeste", "PC")
+
+    def test_loaded_games_share_category_strings(self):
+        """Testet, dass geladene Spiele kompakt sind und Kategorien teilen."""
+        self.library.import_games([
+            {'title': "Doom", 'platform': "PC", 'date_added': "2024-01-01"},
+            {'title': "Quake", 'platform': "PC", 'date_added': "2024-01-01"},
+        ])
+        first, second = GameLibrary(self.csv_path).games
+        self.assertFalse(hasattr(first, "__dict__"))
+        self.assertIs(first.platform, second.platform)
+        self.assertIs(first.date_added, second.date_added)
+        self.assertEqual(first.to_dict()['platform'], "PC")
+
+    def test_update_unknown_game_returns_none(self):
+        """Testet das Aktualisieren einer nicht vorhandenen ID."""
+        self.assertIsNone(self.library.update_game(42, "Playing", "Action"))
+
+
+class TestCsvChangeDetection(TempLibraryTestCase):
+    def test_ids_continue_without_reparsing(self):
+        """Testet, dass IDs fortlaufend aus dem Speicher vergeben werden."""
+        first = self.library.add_game("Hollow Knight", "PC")
+        second = self.library.add_game("Stardew Valley", "PC")
+        self.assertEqual(second['id'], first['id'] + 1)
+        self.assertFalse(self.library.reload_if_changed())
+
+    def test_external_change_is_reloaded(self):
+        """Testet, dass Änderungen durch andere Prozesse erkannt werden."""
+        self.library.add_game("Hollow Knight", "PC")
+        other = GameLibrary(self.csv_path)
+        other.add_game("Stardew Valley", "PC")
+        game = self.library.add_game("Terraria", "PC")
+        self.assertEqual(game['id'], 3)
+        self.assertEqual(len(self.library.games), 3)
+        with self.assertRaises(ValueError):
+            self.library.add_game("Stardew Valley", "PC")
+
+    def test_missing_csv_is_created_with_header(self):
+        """Testet, dass eine fehlende CSV-Datei beim ersten Spiel mit Kopfzeile angelegt wird."""
+        csv_path = os.path.join(self.tmp_dir.name, "new_games.csv")
+        library = GameLibrary(csv_path)
+        self.assertEqual(library.games, [])
+        library.add_game("Hollow Knight", "PC")
+        library.add_game("Celeste", "Switch")
+        reloaded = GameLibrary(csv_path)
+        self.assertEqual([game.title for game in reloaded.games], ["Hollow Knight", "Celeste"])
+
+
+class TestUpdateJournal(TempLibraryTestCase):
+    def test_update_is_replayed_from_journal(self):
+        """Testet, dass Updates im Journal landen und beim Laden angewendet werden."""
+        game = self.library.add_game("Elden Ring", "PS5")
+        with open(self.csv_path) as file:
+            csv_before = file.read()
+        self.library.update_game(game['id'], "Completed", "RPG", 5, "Sehr schwer")
+        with open(self.csv_path) as file:
+            self.assertEqual(file.read(), csv_before)
+
+        reloaded = GameLibrary(self.csv_path).get_game_by_id(game['id'])
+        self.assertEqual(reloaded['status'], "Completed")
+        self.assertEqual(reloaded['genre'], "RPG")
+        self.assertEqual(reloaded['rating'], "5")
+        self.assertEqual(reloaded['review'], "Sehr schwer")
+        self.assertIsNotNone(reloaded['completion_date'])
+
+    def test_compaction_folds_journal_into_csv(self):
+        """Testet, dass die Kompaktierung das Journal in die CSV-Datei übernimmt."""
+        library = GameLibrary(self.csv_path, journal_limit=2)
+        game = library.add_game("Elden Ring", "PS5")
+        library.update_game(game['id'], "Playing", "RPG", 3)
+        self.assertTrue(os.path.exists(library.storage.journal_path))
+        library.update_game(game['id'], "Completed", "RPG", 4)
+        self.assertFalse(os.path.exists(library.storage.journal_path))
+
+        reloaded = GameLibrary(self.csv_path).get_game_by_id(game['id'])
+        self.assertEqual(reloaded['status'], "Completed")
+        self.assertEqual(reloaded['rating'], "4")
+
+
+    def test_rows_with_duplicate_ids_are_renumbered(self):
+        """Testet, dass Zeilen mit derselben ID alle geladen werden und neue IDs bekommen."""
+        with open(self.csv_path, "a", newline="\n") as file:
+            file.write("1,Fortnite,PC,Completed,3,Action,,2025-02-04,2025-02-04\r\n")
+            file.write("1,Dark Souls,PS4,Want to Play,,Action,,2025-02-05,\r\n")
+            file.write("2,Celeste,Switch,Want to Play,,Action,,2025-02-05,\r\n")
+        with open(self.csv_path + ".journal", "w", newline="\n") as file:
+            file.write("1,Fortnite,PC,Completed,5,Action,,2025-02-04,2025-02-04\r\n")
+        library = GameLibrary(self.csv_path)
+        self.assertEqual([(game.id, game.title, game.rating) for game in library.games],
+                         [(1, "Fortnite", "5"), (3, "Dark Souls", None), (2, "Celeste", None)])
+        self.assertEqual([game['title'] for game in library.get_games_page(0, 10, sort_by="title")['games']],
+                         ["Celeste", "Dark Souls", "Fortnite"])
+
+        library.update_game(3, "Completed", "Action", 4)
+        reloaded = GameLibrary(self.csv_path)
+        self.assertEqual([(game.id, game.title, game.rating) for game in reloaded.games],
+                         [(1, "Fortnite", "5"), (3, "Dark Souls", "4"), (2, "Celeste", None)])
+        self.assertEqual(reloaded.add_game("Hades", "PC")['id'], 4)
+
+
+class TestBulkImport(TempLibraryTestCase):
+    def test_import_from_iterable(self):
+        """Testet den Import mit Duplikaten und ungültigen Einträgen."""
+        self.library.add_game("Hades", "PC")
+        summary = self.library.import_games([
+            {'title': "Celeste", 'platform': "Switch", 'genre': "Puzzle"},
+            {'title': "celeste ", 'platform': "PC"},
+            {'title': "HADES", 'platform': "PC"},
+            {'title': "", 'platform': "PC"},
+            {'title': "Inside", 'platform': "PC", 'date_added': "kein Datum"},
+            {'title': "Limbo", 'platform': "PC", 'status': "Completed", 'completion_date': "2024-05-01"},
+        ])
+        self.assertEqual(summary, {'inserted': 2, 'skipped': 2, 'invalid': 2})
+        self.assertEqual([game['id'] for game in self.library.get_games()], [1, 2, 3])
+
+        reloaded = GameLibrary(self.csv_path)
+        self.assertEqual(len(reloaded.games), 3)
+        self.assertEqual(str(reloaded.get_game_by_id(3)['completion_date']), "2024-05-01")
+
+    def test_import_from_jsonl_file(self):
+        """Testet den Import aus einer JSON-Lines-Datei."""
+        path = os.path.join(self.tmp_dir.name, "export.jsonl")
+        with open(path, "w") as file:
+            file.write('{"title": "Outer Wilds", "platform": "PC"}\n')
+            file.write('kein json\n')
+            file.write('{"title": "Tunic", "platform": "PC", "rating": "4"}\n')
+        summary = self.library.import_games(path)
+        self.assertEqual(summary, {'inserted': 2, 'skipped': 0, 'invalid': 1})
+        self.assertEqual(self.library.get_game_by_name("Tunic")[0]['rating'], "4")
+
+    def test_import_keeps_zero_rating(self):
+        """Testet, dass eine Bewertung von 0 beim Import erhalten bleibt."""
+        self.library.import_games([
+            {'title': "E.T.", 'platform': "Atari 2600", 'rating': 0},
+            {'title': "Superman 64", 'platform': "N64", 'rating': ""},
+        ])
+        self.assertEqual(self.library.get_game_by_name("E.T.")[0]['rating'], 0)
+        self.assertIsNone(self.library.get_game_by_name("Superman 64")[0]['rating'])
+        self.assertEqual(GameLibrary(self.csv_path).get_game_by_name("E.T.")[0]['rating'], "0")
+
+
+class TestStreaming(TempLibraryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.library.import_games([
+            {'title': "Doom", 'platform': "PC", 'status': "Completed"},
+            {'title': "Doom Eternal", 'platform': "PS5"},
+            {'title': "Tetris", 'platform': "PC", 'genre': "Puzzle"},
+        ])
+
+    def test_iter_games_filters_lazily(self):
+        """Testet, dass iter_games ein Generator mit Filtern ist."""
+        games = self.library.iter_games(platform="PC", title="doom")
+        self.assertEqual(next(games)['title'], "Doom")
+        self.assertEqual(list(games), [])
+
+    def test_get_games_page_returns_slice_and_total(self):
+        """Testet das seitenweise Abrufen gefilterter Spiele."""
+        page = self.library.get_games_page(offset=1, limit=1, title="DOOM")
+        self.assertEqual(page['total'], 2)
+        self.assertEqual([game['title'] for game in page['games']], ["Doom Eternal"])
+        self.library.update_game(1, "Playing", "Action")
+        page = self.library.get_games_page(limit=5, status="Completed")
+        self.assertEqual((page['total'], page['games']), (0, []))
+
+    def test_stream_games_applies_journal(self):
+        """Testet das Streamen direkt aus der CSV-Datei inklusive Journal."""
+        self.library.update_game(2, "Completed", "Action", 5)
+        titles = [game['title'] for game in stream_games(CsvStorage(self.csv_path), status="Completed")]
+        self.assertEqual(titles, ["Doom", "Doom Eternal"])
+
+
+class TestTitleSearch(TempLibraryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.library.import_games([
+            {'title': "The Witcher 3", 'platform': "PC"},
+            {'title': "Witchfire", 'platform': "PC"},
+            {'title': "Portal", 'platform': "PC"},
+        ])
+
+    def test_search_is_case_insensitive_substring(self):
+        """Testet die Teilstring-Suche über den Titelindex."""
+        self.assertEqual([game['title'] for game in self.library.search_titles("WITCH")],
+                         ["The Witcher 3", "Witchfire"])
+        self.assertEqual([game['title'] for game in self.library.search_titles("witcher")], ["The Witcher 3"])
+        self.assertEqual([game['title'] for game in self.library.search_titles("r 3")], ["The Witcher 3"])
+        self.assertEqual(self.library.search_titles("zelda"), [])
+
+    def test_search_sees_new_games_after_refinement(self):
+        """Testet, dass neue Spiele trotz zwischengespeicherter Suche gefunden werden."""
+        self.library.search_titles("po")
+        self.library.add_game("Portal 2", "PC")
+        self.assertEqual([game['title'] for game in self.library.search_titles("port")], ["Portal", "Portal 2"])
+
+
+class TestFuzzyTitles(TempLibraryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.library.import_games([
+            {'title': "The Witcher 3", 'platform': "PC"},
+            {'title': "Hollow Knight", 'platform': "Switch"},
+            {'title': "Hades", 'platform': "PC"},
+        ])
+
+    def test_edit_distance(self):
+        """Testet die Levenshtein-Distanz."""
+        self.assertEqual(edit_distance("kitten", "sitting"), 3)
+        self.assertEqual(edit_distance("", "abc"), 3)
+        self.assertEqual(edit_distance("witcher", "witcher"), 0)
+
+    def test_find_similar_titles(self):
+        """Testet die unscharfe Suche nach ähnlichen Titeln."""
+        self.assertEqual([game['title'] for game in self.library.find_similar_titles("Witcher 3")], ["The Witcher 3"])
+        self.assertEqual([game['title'] for game in self.library.find_similar_titles("holow knigt")], ["Hollow Knight"])
+        self.assertEqual(self.library.find_similar_titles("Portal"), [])
+
+    def test_similar_titles_include_new_games(self):
+        """Testet, dass der Fuzzy-Index nach dem Aufbau weiter gepflegt wird."""
+        self.library.find_similar_titles("Hades")
+        self.library.add_game("Hades II", "PC")
+        self.assertEqual([game['title'] for game in self.library.find_similar_titles("Hades III")],
+                         ["Hades II"])
+
+    def test_fuzzy_index_finds_all_close_keys(self):
+        """Testet den Trigramm-Filter des Fuzzy-Index gegen einen Vergleich mit allen Titeln."""
+        keys = [fuzzy_key(title) for title in (
+            "The Witcher 3", "Witcher 2", "Hades", "Hades II", "Halo", "Hollow Knight", "Doom", "Doom Eternal",
+            "Portal", "Portal 2", "aaaa", "aaab", "a", "", "Baldur's Gate 3", "Celeste", "Celest",
+        )]
+        index = FuzzyIndex()
+        for number, key in enumerate(keys):
+            index.add(key, number)
+        for query in ["hades", "halo 2", "witcher 3", "dom", "aaaaa", "b", "", "baldurs gate", "celste"]:
+            for max_distance in (1, 2, 3):
+                expected = sorted(
+                    (edit_distance(query, key), number) for number, key in enumerate(keys)
+                    if edit_distance(query, key) <= max_distance
+                )
+                self.assertEqual(index.search(query, max_distance), expected, (query, max_distance))
+
+    def test_fuzzy_index_built_in_background(self):
+        """Testet den Aufbau des Fuzzy-Index im Hintergrund inklusive später hinzugefügter Spiele."""
+        with mock.patch("backend.BACKGROUND_FUZZY_INDEX_GAMES", 2):
+            library = GameLibrary(self.csv_path)
+        self.assertIsNotNone(library._fuzzy_build)
+        library.add_game("Hades II", "PC")
+        self.assertEqual([game['title'] for game in library.find_similar_titles("Hades III")], ["Hades II"])
+        self.assertEqual([game['title'] for game in library.find_similar_titles("Witcher 3")], ["The Witcher 3"])
+
+    def test_fuzzy_page_falls_back_to_similar_titles(self):
+        """Testet den Fallback der Namenssuche auf ähnliche Titel."""
+        self.assertEqual(self.library.get_games_page(title="hadez")['total'], 0)
+        page = self.library.get_games_page(title="hadez", fuzzy=True)
+        self.assertEqual([game['title'] for game in page['games']], ["Hades"])
+
+
+class TestStatistics(TempLibraryTestCase):
+    def test_statistics_follow_adds_and_updates(self):
+        """Testet, dass die Statistik bei Hinzufügen und Aktualisieren mitläuft."""
+        self.library.import_games([
+            {'title': "Doom", 'platform': "PC", 'rating': "4"},
+            {'title': "Halo", 'platform': "Xbox", 'genre': "Action"},
+        ])
+        self.library.add_game("Tetris", "PC", genre="Puzzle")
+        self.library.update_game(2, "Completed", "Action", 2)
+        self.library.update_game(1, "Playing", "Action", 5)
+
+        stats = self.library.get_statistics()
+        self.assertEqual(stats['total_games'], 3)
+        self.assertEqual(stats['completed_games'], 1)
+        self.assertEqual(stats['average_rating'], 3.5)
+        self.assertEqual(stats['platforms'], {"PC": 2, "Xbox": 1})
+        self.assertEqual(stats['genres'], {"Action": 2, "Puzzle": 1})
+        self.assertEqual(stats, GameLibrary(self.csv_path).get_statistics())
+
+    def test_statistics_of_empty_library(self):
+        """Testet die Statistik einer leeren Bibliothek."""
+        stats = self.library.get_statistics()
+        self.assertEqual(stats['total_games'], 0)
+        self.assertIsNone(stats['average_rating'])
+
+
+class FlakyCsvStorage(CsvStorage):
+    """CsvStorage, bei der das erste Schreiben fehlschlägt."""
+
+    def __init__(self, csv_path):
+        super().__init__(csv_path)
+        self.failures = 1
+
+    def insert_many(self, rows):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("Festplatte voll")
+        super().insert_many(rows)
+
+
+class TestWriteBehind(TempLibraryTestCase):
+    def test_changes_are_written_in_background(self):
+        """Testet, dass der Schreib-Thread alle Änderungen gebündelt speichert."""
+        library = GameLibrary(self.csv_path, write_behind=True)
+        game = library.add_game("Celeste", "Switch")
+        for rating in range(1, 6):
+            library.update_game(game['id'], "Playing", "Action", rating)
+        library.import_games([{'title': "Hades", 'platform': "PC"}])
+        library.close()
+
+        self.assertTrue(all(result['ok'] for result in library.poll_persistence()))
+        reloaded = GameLibrary(self.csv_path)
+        self.assertEqual(reloaded.get_game_by_id(game['id'])['rating'], "5")
+        self.assertEqual(len(reloaded.games), 2)
+
+    def test_failed_batch_is_reported_and_retried(self):
+        """Testet, dass Fehler gemeldet und mit dem nächsten Schreiben wiederholt werden."""
+        library = GameLibrary(storage=FlakyCsvStorage(self.csv_path), write_behind=True)
+        library.add_game("Celeste", "Switch")
+        library.flush()
+        self.assertEqual(library.poll_persistence(), [{'ok': False, 'error': "Festplatte voll"}])
+
+        library.add_game("Hades", "PC")
+        library.close()
+        self.assertEqual(library.poll_persistence(), [{'ok': True, 'writes': 2}])
+        self.assertEqual(len(GameLibrary(self.csv_path).games), 2)
+
+
+def _add_games_in_process(csv_path, prefix, count):
+    """Fügt in einem eigenen Prozess Spiele hinzu und bewertet sie."""
+    library = GameLibrary(csv_path)
+    for number in range(count):
+        game = library.add_game(f"{prefix} {number}", "PC")
+        library.update_game(game['id'], "Playing", "Action", 3)
+
+
+class TestConcurrentAccess(TempLibraryTestCase):
+    def test_update_after_foreign_write_is_retried(self):
+        """Testet, dass ein Update nach einer fremden Änderung neu geladen und wiederholt wird."""
+        game = self.library.add_game("Celeste", "Switch")
+        GameLibrary(self.csv_path).add_game("Hades", "PC")
+
+        self.library.update_game(game['id'], "Completed", "Action", 5)
+        self.assertEqual(len(self.library.games), 2)
+        reloaded = GameLibrary(self.csv_path)
+        self.assertEqual(reloaded.get_game_by_id(game['id'])['rating'], "5")
+        self.assertEqual(reloaded.get_game_by_name("Hades")[0]['id'], 2)
+
+    def test_write_behind_conflict_is_resolved(self):
+        """Testet, dass der Schreib-Thread Konflikte meldet und die Änderungen erneut schreibt."""
+        library = GameLibrary(self.csv_path, write_behind=True)
+        game = library.add_game("Celeste", "Switch")
+        library.flush()
+        GameLibrary(self.csv_path).add_game("Hades", "PC")
+
+        library.update_game(game['id'], "Completed", "Action", 4)
+        library.writer.flush()
+        self.assertTrue(any(result.get('conflict') for result in library.poll_persistence()))
+        library.close()
+
+        reloaded = GameLibrary(self.csv_path)
+        self.assertEqual(len(reloaded.games), 2)
+        self.assertEqual(reloaded.get_game_by_id(game['id'])['rating'], "4")
+
+    def test_exit_without_close_resolves_conflict(self):
+        """Testet, dass beim Beenden ohne close() auch nach einem Konflikt alle Änderungen gespeichert werden."""
+        script = (
+            "import sys\n"
+            "from backend import GameLibrary\n"
+            "library = GameLibrary(sys.argv[1], write_behind=True, commit_window=0.2)\n"
+            "library.add_game('Mine', 'PC')\n"
+            "GameLibrary(sys.argv[1]).add_game('Other', 'PC')\n"
+        )
+        subprocess.run([sys.executable, "-c", script, self.csv_path], check=True,
+                       cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True)
+        reloaded = GameLibrary(self.csv_path)
+        self.assertEqual(sorted(game.title for game in reloaded.games), ["Mine", "Other"])
+
+    def test_write_behind_add_does_not_wait_for_queue(self):
+        """Testet, dass add_game mit Schreib-Thread nicht auf die Warteschlange wartet."""
+        library = GameLibrary(self.csv_path, write_behind=True, commit_window=0.05)
+        game = library.add_game("Celeste", "Switch")
+        library.update_game(game['id'], "Playing", "Action", 3)
+        with mock.patch.object(library.writer, "flush") as flush:
+            library.add_game("Hades", "PC")
+            library.import_games([{'title': "Hollow Knight", 'platform': "PC"}])
+        self.assertEqual(flush.call_count, 0)
+        library.close()
+        self.assertEqual(len(GameLibrary(self.csv_path).games), 3)
+
+    def test_write_behind_duplicate_of_foreign_game_is_dropped(self):
+        """Testet, dass ein parallel von einem anderen Prozess angelegtes Spiel nicht doppelt gespeichert wird."""
+        library = GameLibrary(self.csv_path, write_behind=True)
+        library.add_game("Celeste", "Switch")
+        library.flush()
+        GameLibrary(self.csv_path).add_game("Hades", "PC")
+
+        library.add_game("Hades", "PC")
+        library.add_game("Hollow Knight", "PC")
+        library.close()
+
+        reloaded = GameLibrary(self.csv_path)
+        self.assertEqual(sorted(game.title for game in reloaded.games), ["Celeste", "Hades", "Hollow Knight"])
+        self.assertEqual(len({game.id for game in reloaded.games}), 3)
+
+    def test_parallel_processes_do_not_lose_writes(self):
+        """Testet mehrere Prozesse, die gleichzeitig in dieselbe Datei schreiben."""
+        processes = [
+            multiprocessing.Process(target=_add_games_in_process, args=(self.csv_path, f"Spiel {name}", 15))
+            for name in "ABC"
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+
+        games = GameLibrary(self.csv_path).get_games()
+        self.assertEqual(len(games), 45)
+        self.assertEqual(sorted(game['id'] for game in games), list(range(1, 46)))
+        self.assertTrue(all(game['rating'] == "3" for game in games))
+
+
+class TestSqliteStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "games.db")
+        self.library = GameLibrary(storage=SqliteStorage(self.db_path))
+
+    def tearDown(self):
+        self.library.close()
+        self.tmp_dir.cleanup()
+
+    def test_add_and_update_are_persisted(self):
+        """Testet Hinzufügen und Aktualisieren mit der SQLite-Engine."""
+        game = self.library.add_game("Factorio", "PC", genre="Strategy")
+        self.library.update_game(game['id'], "Completed", "Strategy", 5, "Die Fabrik muss wachsen")
+
+        storage = SqliteStorage(self.db_path)
+        try:
+            reloaded = GameLibrary(storage=storage).get_game_by_id(game['id'])
+        finally:
+            storage.close()
+        self.assertEqual(reloaded['title'], "Factorio")
+        self.assertEqual(reloaded['status'], "Completed")
+        self.assertEqual(reloaded['rating'], "5")
+        self.assertEqual(reloaded['review'], "Die Fabrik muss wachsen")
+
+    def test_change_by_other_connection_is_detected(self):
+        """Testet, dass Änderungen über eine zweite Verbindung erkannt werden."""
+        storage = SqliteStorage(self.db_path)
+        try:
+            GameLibrary(storage=storage).add_game("Factorio", "PC")
+        finally:
+            storage.close()
+        self.assertTrue(self.library.reload_if_changed())
+        with self.assertRaises(ValueError):
+            self.library.add_game("factorio", "PC")
+
+
+class TestQuery(TempLibraryTestCase):
+    def setUp(self):
+        super().setUp()
+        for title, platform, genre in [("Celeste", "Switch", "Action"), ("Hades", "PC", "Action"),
+                                       ("Stardew Valley", "PC", "Simulation"), ("Portal 2", "PC", "Puzzle")]:
+            self.library.add_game(title, platform, genre=genre)
+        self.library.update_game(1, "Completed", "Action", 5)
+        self.library.update_game(2, "Completed", "Action", 3)
+        self.library.update_game(3, "Playing", "Simulation", 4)
+
+    def test_combines_filters(self):
+        """Testet die Kombination von Status, Plattform, Genre und Bewertung."""
+        titles = [game['title'] for game in self.library.query(status="Completed", platform="PC")]
+        self.assertEqual(titles, ["Hades"])
+        titles = [game['title'] for game in self.library.query(platform="PC", min_rating=4)]
+        self.assertEqual(titles, ["Stardew Valley"])
+        titles = [game['title'] for game in self.library.query(genre="Action", min_rating=3, max_rating=5)]
+        self.assertEqual(titles, ["Celeste", "Hades"])
+        self.assertEqual(self.library.query(genre="Puzzle", min_rating=1), [])
+
+    def test_date_ranges(self):
+        """Testet Datumsbereiche für Hinzufügen und Abschluss."""
+        today = date.today()
+        self.assertEqual(len(self.library.query(added_from=today, added_to=today.isoformat())), 4)
+        completed = self.library.query(completed_from=today)
+        self.assertEqual([game['id'] for game in completed], [1, 2])
+        self.assertEqual(self.library.query(completed_to="2000-01-01"), [])
+
+    def test_indexes_follow_updates(self):
+        """Testet, dass die Indizes nach einer Änderung aktuell sind."""
+        self.library.update_game(4, "Abandoned", "Puzzle", 1)
+        self.assertEqual([game['id'] for game in self.library.query(status="Abandoned")], [4])
+        self.assertEqual([game['id'] for game in self.library.query(max_rating=2)], [4])
+        self.assertEqual([game['id'] for game in self.library.query(status="Want to Play")], [])
+        self.assertEqual(len(self.library.query()), 4)
+
+
+class TestSortedPages(TempLibraryTestCase):
+    def setUp(self):
+        super().setUp()
+        for title in ["Celeste", "hades", "Stardew Valley", "Portal 2", "Braid"]:
+            self.library.add_game(title, "PC")
+        for game_id, rating in [(1, 4), (2, 5), (3, 2), (4, 5)]:
+            self.library.update_game(game_id, "Playing", "Action", rating)
+
+    def titles(self, page):
+        return [game['title'] for game in page['games']]
+
+    def test_sort_by_title_and_rating(self):
+        """Testet die Sortierung nach Titel und Bewertung mit Offset und Limit."""
+        page = self.library.get_games_page(offset=1, limit=2, sort_by="title")
+        self.assertEqual(self.titles(page), ["Celeste", "hades"])
+        self.assertEqual(page['total'], 5)
+        page = self.library.get_games_page(limit=3, sort_by="rating", descending=True)
+        self.assertEqual(self.titles(page), ["Portal 2", "hades", "Celeste"])
+        page = self.library.get_games_page(offset=3, limit=5, sort_by="rating")
+        self.assertEqual(self.titles(page), ["Portal 2", "Braid"])  # Ohne Bewertung ans Ende
+
+    def test_sort_with_filter(self):
+        """Testet die Sortierung zusammen mit Filtern."""
+        page = self.library.get_games_page(limit=10, status="Playing", sort_by="title", descending=True)
+        self.assertEqual(self.titles(page), ["Stardew Valley", "Portal 2", "hades", "Celeste"])
+        page = self.library.get_games_page(limit=10, sort_by="rating", min_rating=4)
+        self.assertEqual(page['total'], 3)
+
+    def test_cursor_pages_follow_changes(self):
+        """Testet die Cursor-Paginierung, auch wenn sich dazwischen Spiele ändern."""
+        page = self.library.get_games_page(limit=2, sort_by="title")
+        self.assertEqual(self.titles(page), ["Braid", "Celeste"])
+        self.library.add_game("Antichamber", "PC")  # Vor dem Cursor, verschiebt keine Seite
+        self.library.update_game(4, "Completed", "Puzzle", 5)
+        page = self.library.get_games_page(limit=2, sort_by="title", cursor=page['cursor'])
+        self.assertEqual(self.titles(page), ["hades", "Portal 2"])
+        page = self.library.get_games_page(limit=2, sort_by="title", cursor=page['cursor'], status="Playing")
+        self.assertEqual(self.titles(page), ["Stardew Valley"])
+
+    def test_unknown_sort_field(self):
+        """Testet, dass unbekannte Sortierfelder abgelehnt werden."""
+        with self.assertRaises(ValueError):
+            self.library.get_games_page(sort_by="platform")
+
+
+class TestAnalytics(TempLibraryTestCase):
+    def setUp(self):
+        super().setUp()
+        for title, genre in [("Celeste", "Action"), ("Hades", "Action"), ("Factorio", "Strategy")]:
+            self.library.add_game(title, "PC", genre=genre)
+        self.library.update_game(1, "Completed", "Action", 4)
+        self.library.update_game(2, "Completed", "Action", 5)
+        self.library.update_game(3, "Playing", "Strategy", 3)
+        self.month = date.today().strftime("%Y-%m")
+
+    def test_rollups(self):
+        """Testet Abschlüsse pro Monat, Bewertungen pro Genre und Backlog-Wachstum."""
+        result = self.library.get_analytics()
+        self.assertEqual(result['completions_per_month'], {self.month: 2})
+        year = date.today().year
+        self.assertEqual(result['genre_ratings_per_year'], {'Action': {year: 4.5}, 'Strategy': {year: 3.0}})
+        self.assertEqual(result['backlog_growth'], [{'month': self.month, 'added': 3, 'completed': 2, 'backlog': 1}])
+
+    def test_cache_is_invalidated_by_changes(self):
+        """Testet, dass Änderungen die zwischengespeicherten Ergebnisse ersetzen."""
+        first = self.library.get_analytics()
+        self.assertIs(self.library.get_analytics(), first)
+        self.library.update_game(3, "Completed", "Strategy", 3)
+        self.assertEqual(self.library.get_analytics()['completions_per_month'], {self.month: 3})
+
+    def test_plain_python_gives_same_results(self):
+        """Testet, dass die Berechnung ohne NumPy dieselben Ergebnisse liefert."""
+        columns = analytics.LibraryColumns(self.library.games)
+        expected = analytics.genre_ratings_per_year(columns), analytics.backlog_growth(columns)
+        numpy, analytics.np = analytics.np, None
+        try:
+            columns = analytics.LibraryColumns(self.library.games)
+            actual = analytics.genre_ratings_per_year(columns), analytics.backlog_growth(columns)
+        finally:
+            analytics.np = numpy
+        self.assertEqual(actual, expected)
+
+
+class TestFullTextSearch(TempLibraryTestCase):
+    def setUp(self):
+        super().setUp()
+        reviews = {
+            "Elden Ring": "Open world with brutal boss fights",
+            "Zelda Breath of the Wild": "The best open world, great puzzles",
+            "Celeste": "Hard platforming and a moving story",
+        }
+        for title, review in reviews.items():
+            game = self.library.add_game(title, "PC")
+            self.library.update_game(game['id'], "Completed", "Action", 5, review)
+
+    def test_results_are_ranked(self):
+        """Testet die Rangfolge nach Relevanz (BM25)."""
+        results = self.library.search_text("open world boss fights")
+        self.assertEqual([game['title'] for game in results], ["Elden Ring", "Zelda Breath of the Wild"])
+        self.assertGreater(results[0]['score'], results[1]['score'])
+        self.assertEqual(self.library.search_text("Celeste")[0]['title'], "Celeste")
+        self.assertEqual(self.library.search_text("racing"), [])
+
+    def test_update_replaces_review_postings(self):
+        """Testet, dass update_game nur die Einträge des geänderten Spiels ersetzt."""
+        self.library.search_text("story")  # Index aufbauen
+        self.library.update_game(3, "Completed", "Action", 5, "Precise controls and boss fights")
+        self.assertEqual(self.library.search_text("story"), [])
+        self.assertCountEqual([game['id'] for game in self.library.search_text("boss")], [1, 3])
+        new_game = self.library.add_game("Hollow Knight", "PC")
+        self.assertEqual(self.library.search_text("hollow")[0]['id'], new_game['id'])
+
+
+class TestReviewStore(TempLibraryTestCase):
+    LONG_REVIEW = "Ein langes Review über Erkundung, Kämpfe und Musik. " * 10
+
+    def test_long_review_is_kept_out_of_the_csv(self):
+        """Testet, dass lange Reviews separat gespeichert und erst bei Bedarf geladen werden."""
+        game = self.library.add_game("Outer Wilds", "PC")
+        updated = self.library.update_game(game['id'], "Completed", "Adventure", 5, self.LONG_REVIEW)
+        self.assertEqual(updated['review'], self.LONG_REVIEW)
+        self.library.compact()
+        with open(self.csv_path) as file:
+            content = file.read()
+        self.assertIn(REVIEW_IN_STORE, content)
+        self.assertNotIn("Erkundung", content)
+
+        library = GameLibrary(self.csv_path)
+        self.assertNotIn('review', library.get_games()[0])  # Listen enthalten keine Reviews
+        self.assertEqual(library.get_game_by_id(game['id'])['review'], self.LONG_REVIEW)
+        self.assertEqual(library.search_text("Erkundung")[0]['id'], game['id'])
+
+    def test_write_behind_stores_reviews_on_writer_thread(self):
+        """Testet, dass lange Reviews im Write-Behind-Modus nur vom Schreib-Thread gespeichert werden."""
+        library = GameLibrary(self.csv_path, write_behind=True)
+        threads = []
+        store_review = library.storage.store_review
+
+        def record_thread(game_id, review):
+            threads.append(threading.current_thread())
+            return store_review(game_id, review)
+
+        game = library.add_game("Outer Wilds", "PC")
+        with mock.patch.object(library.storage, "store_review", side_effect=record_thread):
+            library.update_game(game['id'], "Completed", "Adventure", 5, self.LONG_REVIEW)
+            self.assertEqual(library.get_game_by_id(game['id'])['review'], self.LONG_REVIEW)
+            library.flush()
+            library.update_game(game['id'], "Completed", "Adventure", 4)
+            library.close()
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.current_thread())
+        with open(library.storage.journal_path) as file:
+            self.assertNotIn("Erkundung", file.read())  # Auch spätere Updates behalten nur den Verweis
+
+        reloaded = GameLibrary(self.csv_path)
+        self.assertEqual(reloaded.get_game_by_id(game['id'])['review'], self.LONG_REVIEW)
+        self.assertEqual(reloaded.get_game_by_id(game['id'])['rating'], "4")
+
+    def test_write_behind_review_leaves_memory_and_snapshot(self):
+        """Testet, dass gespeicherte Reviews auch im Speicher und im Snapshot nur als Verweis bleiben."""
+        library = GameLibrary(self.csv_path, write_behind=True)
+        game = library.add_game("Outer Wilds", "PC")
+        library.update_game(game['id'], "Completed", "Adventure", 5, self.LONG_REVIEW)
+        library.flush()
+        self.assertEqual(library.games[0].review, REVIEW_IN_STORE)
+        self.assertEqual(library.get_game_by_id(game['id'])['review'], self.LONG_REVIEW)
+        library.close()
+
+        restarted = GameLibrary(self.csv_path, write_behind=True)  # Lädt aus dem Snapshot
+        restarted.update_game(game['id'], "Completed", "Adventure", 4)
+        restarted.compact()
+        restarted.close()
+        with open(self.csv_path) as file:
+            self.assertNotIn("Erkundung", file.read())
+        self.assertEqual(GameLibrary(self.csv_path).get_game_by_id(game['id'])['review'], self.LONG_REVIEW)
+
+    def test_review_of_renumbered_game_moves_with_it(self):
+        """Testet, dass das Review eines nach einem Konflikt neu nummerierten Spiels mitwandert."""
+        self.library.add_game("Celeste", "Switch")
+        library = GameLibrary(self.csv_path, write_behind=True, commit_window=0.2)
+        mine = library.add_game("Mine", "PC")
+        library.update_game(mine['id'], "Completed", "Adventure", 5, self.LONG_REVIEW)
+        other = GameLibrary(self.csv_path).add_game("Other", "PC")
+        self.assertEqual(other['id'], mine['id'])
+        library.close()
+
+        reloaded = GameLibrary(self.csv_path)
+        self.assertIsNone(reloaded.get_game_by_name("Other")[0]['review'])
+        moved = reloaded.get_game_by_name("Mine")[0]
+        self.assertNotEqual(moved['id'], mine['id'])
+        self.assertEqual(reloaded.get_game_by_id(moved['id'])['review'], self.LONG_REVIEW)
+        self.assertEqual(reloaded.get_game_by_id(moved['id'])['rating'], "5")
+
+    def test_short_review_stays_in_the_row(self):
+        """Testet, dass kurze Reviews in der CSV-Datei bleiben."""
+        game = self.library.add_game("Tetris", "Switch")
+        self.library.update_game(game['id'], "Completed", "Puzzle", 4, "Zeitlos")
+        self.assertEqual(self.library.games[0].review, "Zeitlos")
+        self.assertFalse(os.path.exists(self.library.storage.reviews.path))
+
+    def test_compaction_keeps_latest_reviews(self):
+        """Testet das Verdichten ersetzter Reviews."""
+        store = ReviewStore(self.csv_path + ".reviews")
+        store.COMPACT_MIN_BYTES = 0
+        for version in range(5):
+            store.put(1, f"Version {version}: {self.LONG_REVIEW}")
+        store.put(2, self.LONG_REVIEW)
+        self.assertEqual(store.get(1), f"Version 4: {self.LONG_REVIEW}")
+        self.assertEqual(ReviewStore(store.path).get(2), self.LONG_REVIEW)
+        self.assertLess(os.path.getsize(store.path), 3 * len(self.LONG_REVIEW.encode()))
+        self.assertIsNone(store.get(3))
+
+    def test_compressed_reviews(self):
+        """Testet komprimiert gespeicherte Reviews."""
+        store = ReviewStore(self.csv_path + ".reviews", compress=True)
+        store.put(1, self.LONG_REVIEW)
+        self.assertEqual(ReviewStore(store.path).get(1), self.LONG_REVIEW)
+        self.assertLess(os.path.getsize(store.path), len(self.LONG_REVIEW) // 2)
+
+
+class TestInstrumentation(TempLibraryTestCase):
+    def test_instrumentation_is_off_by_default(self):
+        """Testet, dass ohne Instrumentierung keine Methoden ersetzt werden."""
+        self.assertIsNone(self.library.get_instrumentation())
+        self.assertNotIn("add_game", vars(self.library))
+
+    def test_records_calls_and_rows(self):
+        """Testet Aufrufe, Laufzeiten und geschriebene Zeilen pro Operation."""
+        library = GameLibrary(self.csv_path, instrument=True)
+        game = library.add_game("Celeste", "Switch")
+        library.update_game(game['id'], "Completed", "Action", 5)
+        library.get_game_by_id(game['id'])
+        list(library.iter_games(status="Completed"))
+
+        snapshot = library.get_instrumentation()
+        self.assertEqual(snapshot['load_from_csv']['calls'], 1)
+        self.assertEqual(snapshot['add_game']['rows_written'], 1)
+        self.assertEqual(snapshot['update_game']['rows_written'], 1)
+        self.assertEqual(snapshot['storage.update_many']['rows_written'], 1)
+        self.assertEqual(snapshot['iter_games']['calls'], 1)
+        self.assertGreaterEqual(snapshot['add_game']['max_ms'], 0)
+
+        library.disable_instrumentation()
+        self.assertIsNone(library.get_instrumentation())
+        self.assertNotIn("add_game", vars(library))
+        self.assertNotIn("update_many", vars(library.storage))
+
+
+class TestBinarySnapshot(TempLibraryTestCase):
+    def setUp(self):
+        super().setUp()
+        game = self.library.add_game("Outer Wilds", "PC", genre="Adventure")
+        self.library.update_game(game['id'], "Completed", "Adventure", 5, "Ein Meisterwerk")
+        self.library.add_game("Tetris", "Switch", genre="Puzzle")
+        self.library.close()
+        self.snapshot_path = self.library.storage.snapshot_path
+
+    def test_close_writes_snapshot_used_on_next_start(self):
+        """Testet, dass der nächste Start aus dem Snapshot lädt."""
+        self.assertTrue(os.path.exists(self.snapshot_path))
+        rows = CsvStorage(self.csv_path).load()
+        self.assertIsInstance(rows[0][7], date)  # Aus der CSV-Datei kämen Strings
+
+        library = GameLibrary(self.csv_path)
+        game = library.get_game_by_id(1)
+        self.assertEqual(game['status'], "Completed")
+        self.assertEqual(game['rating'], "5")
+        self.assertEqual(game['review'], "Ein Meisterwerk")
+        self.assertIsNotNone(game['completion_date'])
+        self.assertEqual(library.next_id, 3)
+
+    def test_stale_snapshot_falls_back_to_csv(self):
+        """Testet, dass nach einer Änderung der CSV-Datei wieder die CSV gelesen wird."""
+        other = GameLibrary(self.csv_path, storage=CsvStorage(self.csv_path, use_snapshot=False))
+        other.add_game("Hollow Knight", "PC")
+
+        library = GameLibrary(self.csv_path)
+        self.assertEqual(len(library.games), 3)
+        self.assertEqual(library.get_game_by_id(3)['title'], "Hollow Knight")
+
+    def test_damaged_snapshot_is_ignored(self):
+        """Testet, dass ein beschädigter Snapshot über die Prüfsumme erkannt wird."""
+        with open(self.snapshot_path, "r+b") as file:
+            file.seek(-5, os.SEEK_END)
+            file.write(b"XXXXX")
+        rows = CsvStorage(self.csv_path).load()
+        self.assertIsInstance(rows[0][7], str)  # Aus der CSV-Datei gelesen
+        self.assertEqual(len(GameLibrary(self.csv_path).games), 2)
+
+
+class CountingCsvStorage(CsvStorage):
+    """CsvStorage, die ihre Schreibvorgänge zählt."""
+
+    def __init__(self, csv_path):
+        super().__init__(csv_path)
+        self.writes = 0
+
+    def update_many(self, rows):
+        self.writes += 1
+        super().update_many(rows)
+
+
+class TestDurability(TempLibraryTestCase):
+    def test_failed_compaction_keeps_old_file(self):
+        """Testet, dass ein Abbruch beim Verdichten die alte CSV-Datei unverändert lässt."""
+        game = self.library.add_game("Celeste", "Switch")
+        self.library.update_game(game['id'], "Completed", "Action", 5)
+        with open(self.csv_path, "rb") as file:
+            before = file.read()
+
+        with mock.patch("storage.os.replace", side_effect=OSError("Absturz")):
+            with self.assertRaises(OSError):
+                self.library.compact()
+        with open(self.csv_path, "rb") as file:
+            self.assertEqual(file.read(), before)
+        self.assertFalse(os.path.exists(self.csv_path + ".tmp"))
+        self.assertEqual(GameLibrary(self.csv_path).get_game_by_id(game['id'])['rating'], "5")
+
+    def test_rows_cut_off_by_crash_are_skipped(self):
+        """Testet, dass abgeschnittene Zeilen ignoriert werden und weitere Spiele lesbar bleiben."""
+        self.library.add_game("Celeste", "Switch")
+        with open(self.csv_path, "a", newline="\n") as file:
+            file.write("2,Hades,PC,Play")
+        with open(self.csv_path + ".journal", "w", newline="\n") as file:
+            file.write("1,Celeste,Switch,Completed,5,Act")
+
+        library = GameLibrary(self.csv_path)
+        self.assertEqual([game['title'] for game in library.get_games()], ["Celeste"])
+        self.assertEqual(library.get_game_by_id(1)['status'], "Want to Play")
+        library.add_game("Hollow Knight", "PC")
+        library.update_game(1, "Playing", "Action", 4)
+
+        reloaded = GameLibrary(self.csv_path)
+        self.assertEqual([game['title'] for game in reloaded.get_games()], ["Celeste", "Hollow Knight"])
+        self.assertEqual(reloaded.get_game_by_id(1)['rating'], "4")
+
+    def test_rows_cut_off_inside_last_field_are_skipped(self):
+        """Testet abgeschnittene Zeilen, die trotzdem alle Felder haben."""
+        self.library.add_game("Celeste", "Switch")
+        with open(self.csv_path, "a", newline="\n") as file:
+            file.write("2,Halo,Xbox,Completed,5,Action,,2024-01-01,2024-0")
+        with open(self.csv_path + ".journal", "w", newline="\n") as file:
+            file.write("1,Celeste,Switch,Completed,5,Action,,2024-01-01,")
+
+        library = GameLibrary(self.csv_path)
+        self.assertEqual([game['title'] for game in library.get_games()], ["Celeste"])
+        self.assertEqual(library.get_game_by_id(1)['status'], "Want to Play")
+        library.add_game("Hollow Knight", "PC")
+        library.update_game(1, "Completed", "Action", 4)
+
+        reloaded = GameLibrary(self.csv_path)
+        self.assertEqual([game['title'] for game in reloaded.get_games()], ["Celeste", "Hollow Knight"])
+        self.assertEqual(reloaded.get_game_by_id(1)['rating'], "4")
+        self.assertIsNotNone(reloaded.get_game_by_id(1)['completion_date'])
+        with open(self.csv_path, newline="") as file:
+            self.assertNotIn("Halo", file.read())
+
+    def test_last_row_without_newline_is_kept(self):
+        """Testet, dass eine vollständige letzte Zeile ohne Zeilenumbruch (z. B. aus einem Editor) erhalten bleibt."""
+        with open(self.csv_path, "a", newline="\n") as file:
+            file.write("1,Fortnite,PC,Completed,3,Action,,2025-02-04,2025-02-04")
+
+        library = GameLibrary(self.csv_path)
+        self.assertEqual([game['title'] for game in library.get_games()], ["Fortnite"])
+        self.assertEqual(library.add_game("Hollow Knight", "PC")['id'], 2)
+
+        reloaded = GameLibrary(self.csv_path)
+        self.assertEqual([game['title'] for game in reloaded.get_games()], ["Fortnite", "Hollow Knight"])
+        with open(self.csv_path, newline="") as file:
+            self.assertIn("2025-02-04\r\n2,Hollow Knight", file.read())
+
+    def test_header_without_newline(self):
+        """Testet eine CSV-Datei, die nur aus der Kopfzeile ohne Zeilenumbruch besteht."""
+        with open(self.csv_path, "w", newline="\n") as file:
+            file.write(",".join(CSV_FIELDS))
+        library = GameLibrary(self.csv_path)
+        self.assertEqual(library.games, [])
+        library.add_game("Hollow Knight", "PC")
+        self.assertEqual([game.title for game in GameLibrary(self.csv_path).games], ["Hollow Knight"])
+
+    def test_full_durability_syncs_every_write(self):
+        """Testet, dass nur mit durability="full" jedes Anhängen mit fsync geschrieben wird."""
+        with mock.patch("storage.os.fsync") as fsync:
+            GameLibrary(self.csv_path, durability="off").add_game("Celeste", "Switch")
+            self.assertEqual(fsync.call_count, 0)
+            GameLibrary(self.csv_path, durability="full").add_game("Hades", "PC")
+            self.assertGreater(fsync.call_count, 0)
+
+    def test_unknown_durability(self):
+        """Testet die Fehlermeldung bei einer unbekannten Durability."""
+        with self.assertRaises(ValueError):
+            GameLibrary(self.csv_path, durability="immer")
+
+    def test_changes_within_commit_window_are_written_together(self):
+        """Testet, dass Änderungen innerhalb des Commit-Fensters gemeinsam geschrieben werden."""
+        game = self.library.add_game("Celeste", "Switch")
+        storage = CountingCsvStorage(self.csv_path)
+        library = GameLibrary(storage=storage, write_behind=True, commit_window=0.5)
+        for rating in range(1, 4):
+            library.update_game(game['id'], "Playing", "Action", rating)
+            time.sleep(0.05)
+        library.close()
+
+        self.assertEqual(storage.writes, 1)
+        self.assertEqual(GameLibrary(self.csv_path).get_game_by_id(game['id'])['rating'], "3")
+
+
+class TestExport(TempLibraryTestCase):
+    LONG_REVIEW = "Wunderschöne Pixelkunst, " * 20
+
+    def setUp(self):
+        super().setUp()
+        self.library.add_game("Celeste", "Switch")
+        self.library.add_game("Hades", "PC")
+        self.library.add_game("Hollow Knight", "PC")
+        self.library.update_game(1, "Completed", "Action", 5, self.LONG_REVIEW)
+        self.output = os.path.join(self.tmp_dir.name, "export")
+
+    def test_jsonl_export_contains_all_games(self):
+        """Testet den JSON-Lines-Export mit Reviews aus dem Review-Speicher."""
+        storage = CsvStorage(self.csv_path)
+        result = export.export_rows(storage.iter_rows(), storage, self.output, "jsonl", chunk_rows=2)
+        with open(self.output, encoding="utf-8") as file:
+            games = [json.loads(line) for line in file]
+        self.assertEqual(result['rows'], 3)
+        self.assertEqual([game['title'] for game in games], ["Celeste", "Hades", "Hollow Knight"])
+        self.assertEqual(games[0]['review'], self.LONG_REVIEW)
+        self.assertEqual(games[0]['rating'], "5")
+        self.assertIsNone(games[1]['completion_date'])
+
+    def test_csv_export_with_selected_columns(self):
+        """Testet den CSV-Export mit einer Auswahl an Spalten."""
+        self.library.export(self.output, "csv", columns=["title", "rating"])
+        with open(self.output, newline="", encoding="utf-8") as file:
+            rows = list(csv.reader(file))
+        self.assertEqual(rows, [["title", "rating"], ["Celeste", "5"], ["Hades", ""], ["Hollow Knight", ""]])
+
+    def test_columnar_export_round_trip(self):
+        """Testet, dass der Spaltenexport über mehrere Blöcke wieder gelesen werden kann."""
+        result = self.library.export(self.output, "columnar", chunk_rows=2)
+        games = list(export.read_columnar(self.output))
+        self.assertEqual(result['rows'], 3)
+        self.assertEqual([game['id'] for game in games], [1, 2, 3])
+        self.assertEqual(games[0]['review'], self.LONG_REVIEW)
+        self.assertEqual(games[2], {
+            'id': 3, 'title': "Hollow Knight", 'platform': "PC", 'status': "Want to Play", 'rating': None,
+            'genre': "Action", 'review': None, 'date_added': games[2]['date_added'], 'completion_date': None,
+        })
+
+    def test_unknown_format_and_column(self):
+        """Testet die Fehlermeldungen bei unbekanntem Format oder unbekannter Spalte."""
+        with self.assertRaises(ValueError):
+            self.library.export(self.output, "xml")
+        with self.assertRaises(ValueError):
+            self.library.export(self.output, "csv", columns=["title", "preis"])
+        self.assertFalse(os.path.exists(self.output))
+
+
+class TestChangeEvents(TempLibraryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.changes = []
+        self.library.subscribe(self.changes.append)
+
+    def test_added_and_updated_events(self):
+        """Testet die Ereignisse beim Hinzufügen und Aktualisieren mit nur den geänderten Feldern."""
+        game = self.library.add_game("Celeste", "Switch")
+        self.library.update_game(game['id'], "Want to Play", "Platformer", 4)
+
+        added, updated = self.changes
+        self.assertEqual((added['event'], added['id']), ("added", game['id']))
+        self.assertEqual(added['fields']['title'], "Celeste")
+        self.assertNotIn('review', added['fields'])
+        self.assertEqual(updated, {'event': "updated", 'id': game['id'], 'fields': {'rating': 4, 'genre': "Platformer"}})
+
+    def test_review_change_is_reported_with_full_text(self):
+        """Testet, dass geänderte Reviews auch aus dem Review-Speicher richtig erkannt werden."""
+        game = self.library.add_game("Celeste", "Switch")
+        first, second = "Schwer, aber fair. " * 20, "Ein Meisterwerk. " * 20
+        self.library.update_game(game['id'], "Completed", "Action", 5, first)
+        self.library.update_game(game['id'], "Completed", "Action", 5, first)
+        self.library.update_game(game['id'], "Completed", "Action", 5, second)
+
+        fields = [change['fields'] for change in self.changes[1:]]
+        self.assertEqual(fields[0]['review'], first)
+        self.assertEqual(fields[0]['status'], "Completed")
+        self.assertIsNotNone(fields[0]['completion_date'])
+        self.assertEqual(fields[1], {})
+        self.assertEqual(fields[2], {'review': second})
+
+    def test_reload_and_unsubscribe(self):
+        """Testet das Ereignis nach dem Neuladen und das Abmelden."""
+        GameLibrary(self.csv_path).add_game("Hades", "PC")
+        self.library.reload_if_changed()
+        self.assertEqual(self.changes, [{'event': "reloaded", 'id': None, 'fields': {}}])
+
+        self.library.unsubscribe(self.changes.append)
+        self.library.add_game("Celeste", "Switch")
+        self.assertEqual(len(self.changes), 1)
+
+    def test_renumbered_games_after_conflict(self):
+        """Testet, dass nach einem Konflikt neu vergebene IDs im Ereignis gemeldet werden."""
+        library = GameLibrary(self.csv_path, write_behind=True, commit_window=0.2)
+        changes = []
+        library.subscribe(changes.append)
+        mine = library.add_game("Mine", "PC")
+        hades = library.add_game("Hades", "PC")
+        other = GameLibrary(self.csv_path)
+        other.add_game("Other", "PC")
+        other.add_game("Hades", "PC")
+        library.close()
+
+        renumbered = changes[-1]['fields']['renumbered']
+        self.assertEqual(changes[-1]['event'], "reloaded")
+        self.assertEqual(renumbered[mine['id']], library.get_game_by_name("Mine")[0]['id'])
+        self.assertEqual(renumbered[hades['id']], other.get_game_by_name("Hades")[0]['id'])
+        self.assertNotEqual(renumbered[mine['id']], mine['id'])
+
+    def test_failing_subscriber_does_not_break_changes(self):
+        """Testet, dass ein fehlerhafter Abonnent die Änderung nicht verhindert."""
+        def broken(change):
+            raise RuntimeError("Ansicht kaputt")
+
+        self.library.subscribe(broken)
+        game = self.library.add_game("Celeste", "Switch")
+        self.assertEqual(self.library.get_game_by_id(game['id'])['title'], "Celeste")
+        self.assertEqual(len(self.changes), 1)
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file